@@ -0,0 +1,580 @@
+"""Offline benchmarks for the queue, tier and results hot paths.
+
+Drives the real handlers (``QueueView.join``/``leave``, ``WaitlistModal.on_submit``,
+``try_matchmake``, queue embed edits, ``/settier`` and ``/results``) in-process against fake
+interactions, channels and messages, so nothing touches the network. Storage is
+real and goes to a temporary ``data/`` directory (the backend follows
+ECTIERS_STORAGE, as in the bot).
+
+Each scenario runs at synthetic scales: waitlists of 10 to 100k entries,
+tierlists of 1k to 1M players, and 10k linked users. It reports throughput
+(operations per second, including the background pipeline and outbound queue
+draining) and p50/p99 handler latency (call to return, i.e. until the ack).
+Debounced queue embed edits fire after the measured window of the button, modal and
+matchmake scenarios (the debounce alone would dominate it); ``queue_embed`` times
+the edit itself, from render to the message edit going out.
+
+Usage (from the project root):
+
+    python benchmarks/hotpaths.py                    # full run, human-readable
+    python benchmarks/hotpaths.py --quick            # smaller scales, for a smoke run
+    python benchmarks/hotpaths.py --only settier     # one scenario
+    python benchmarks/hotpaths.py --save             # store results/<git describe>.json
+    python benchmarks/hotpaths.py --compare benchmarks/results/v1.2.json
+
+``--compare`` flags scenarios whose throughput dropped or whose p99 rose by more
+than ``--tolerance`` against the stored run, and exits non-zero if any did.
+Results are only comparable between runs on the same machine.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+sys.path.insert(0, PROJECT_ROOT)
+
+from discord.utils import utcnow  # noqa: E402
+
+import commands.waitlist as waitlist_cog  # noqa: E402
+from commands.results import Results  # noqa: E402
+from commands.settier import SetTier  # noqa: E402
+from services.outbound import outbound  # noqa: E402
+from services.pipeline import pipeline  # noqa: E402
+from storage.backend import get_backend  # noqa: E402
+from storage.queue_store import QueueStore  # noqa: E402
+from storage.settings import settings as settings_service  # noqa: E402
+from storage.tierlist import tierlist  # noqa: E402
+from storage.usermeta import usermeta  # noqa: E402
+from storage.waitlist_index import WaitlistIndex  # noqa: E402
+
+WAITLIST_SCALES = (10, 1_000, 10_000, 100_000)
+TIERLIST_SCALES = (1_000, 100_000, 1_000_000)
+USERMETA_USERS = 10_000
+QUICK_WAITLIST_SCALES = (10, 1_000)
+QUICK_TIERLIST_SCALES = (1_000, 10_000)
+OPS = 1_000
+QUICK_OPS = 200
+GAMEMODES = ("Sword", "Mace", "Crystal", "Axe", "Pot")
+TIERS = ("HT1", "LT1", "HT2", "LT2", "HT3", "LT3", "HT4", "LT4", "HT5", "LT5")
+REGIONS = ("EU", "NA", "AS", None)
+# A scenario regresses when throughput falls or p99 rises by more than this fraction
+TOLERANCE = 0.25
+
+QUEUE_ROLE = 900
+RESULTS_ROLE = 901
+RESULTS_CHANNEL = 800
+QUEUE_CHANNEL = 700
+# First synthetic Discord user ID; real snowflakes are this long
+USER_BASE = 10 ** 17
+
+_ids = itertools.count(USER_BASE * 5)
+
+
+# ---- Fake Discord objects ----
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+        self.name = f"role-{role_id}"
+
+
+class FakePermissions:
+    administrator = True
+
+
+class FakeUser:
+    def __init__(self, user_id, roles=()):
+        self.id = user_id
+        self.roles = [FakeRole(role_id) for role_id in roles]
+        self.guild_permissions = FakePermissions()
+        self.mention = f"<@{user_id}>"
+
+
+class FakeMessage:
+    def __init__(self, message_id, channel=None):
+        self.id = message_id
+        self.channel = channel
+
+    async def edit(self, **kwargs):
+        await _rest()
+        if self.channel is not None:
+            self.channel.edits += 1
+        return self
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        self.sent = 0
+        self.edits = 0
+
+    async def send(self, content=None, **kwargs):
+        await _rest()
+        self.sent += 1
+        return FakeMessage(next(_ids), self)
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(message_id, self)
+
+
+class FakeGuild:
+    def __init__(self, channels):
+        self.channels = channels
+        self.roles = [FakeRole(QUEUE_ROLE), FakeRole(RESULTS_ROLE)]
+
+    def get_channel(self, channel_id):
+        return self.channels.get(int(channel_id))
+
+
+class FakeBot:
+    def __init__(self):
+        self.channels = {}
+        self.guild = FakeGuild(self.channels)
+        self.dispatched = 0
+
+    def channel(self, channel_id):
+        channel_id = int(channel_id)
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(channel_id)
+        return self.channels[channel_id]
+
+    def get_channel(self, channel_id):
+        return self.channels.get(int(channel_id))
+
+    def get_partial_messageable(self, channel_id):
+        return self.channel(channel_id)
+
+    def dispatch(self, event, *args):
+        self.dispatched += 1
+
+
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, content=None, **kwargs):
+        await _rest()
+        self._done = True
+
+    async def defer(self, **kwargs):
+        await _rest()
+        self._done = True
+
+    async def send_modal(self, modal):
+        await _rest()
+        self._done = True
+
+
+class FakeInteraction:
+    def __init__(self, bot, user, channel):
+        self.id = next(_ids)
+        self.client = bot
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild = bot.guild
+        self.guild_id = 1
+        self.response = FakeResponse()
+        self.created_at = utcnow()
+
+    async def original_response(self):
+        await _rest()
+        return FakeMessage(next(_ids), self.channel)
+
+
+# Simulated round-trip for every fake REST call, set by --rest-delay
+REST_DELAY = 0.0
+
+
+async def _rest():
+    if REST_DELAY:
+        await asyncio.sleep(REST_DELAY)
+
+
+# ---- Synthetic data ----
+
+def make_waitlist(size, rng):
+    return [{
+        "discord_id": str(USER_BASE + i),
+        "ign": f"player{i}",
+        "gamemode": rng.choice(GAMEMODES),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **({"region": region} if (region := rng.choice(REGIONS)) else {}),
+    } for i in range(size)]
+
+
+def make_tierlist(players, rng):
+    data = {gamemode: {tier: [] for tier in TIERS} for gamemode in GAMEMODES}
+    for i in range(players):
+        data[GAMEMODES[i % len(GAMEMODES)]][rng.choice(TIERS)].append(f"player{i}")
+    return data
+
+
+def make_usermeta(users):
+    ign_to_discord = {f"player{i}": str(USER_BASE + i) for i in range(users)}
+    return {"ign_to_discord": ign_to_discord,
+            "discord_to_ign": {uid: [ign] for ign, uid in ign_to_discord.items()}}
+
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+
+# ---- Harness ----
+
+class Scenario:
+    """Times ``ops`` awaited calls of ``op(i)`` and summarises them."""
+
+    def __init__(self, name, scale):
+        self.name = name
+        self.scale = scale
+
+    async def run(self, op, ops, prepare=None, settle=None):
+        latencies = []
+        started = time.perf_counter()
+        for i in range(ops):
+            if prepare is not None:
+                await prepare(i)
+            op_started = time.perf_counter()
+            await op(i)
+            latencies.append(time.perf_counter() - op_started)
+        # Background side effects count toward throughput, not toward handler latency
+        await pipeline.drain()
+        await outbound.drain()
+        if settle is not None:
+            await settle()
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            "scenario": self.name,
+            "scale": self.scale,
+            "ops": ops,
+            "seconds": elapsed,
+            "ops_per_sec": ops / elapsed if elapsed else None,
+            "p50_ms": _percentile(latencies, 50) * 1000.0,
+            "p99_ms": _percentile(latencies, 99) * 1000.0,
+        }
+
+
+def _reset_queue_store(entries):
+    # Fresh store in the scratch directory, installed where the cog and matchmaker read it
+    store = QueueStore()
+    store.waitlist = WaitlistIndex(entries)
+    store.loaded = True
+    waitlist_cog.store = store
+    waitlist_cog.matchmaker.store = store
+    waitlist_cog._render_cache.clear()
+    waitlist_cog._last_sent.clear()
+    store.start()
+    return store
+
+
+async def _finish_queue_store(store):
+    # Let the debounced embed edits go out rather than cancelling them
+    await waitlist_cog.embed_updates.drain()
+    await outbound.drain()
+    await store.close()
+
+
+def _queue_channel(bot, store, gamemode=None, region=None, offset=0):
+    channel = bot.channel(QUEUE_CHANNEL + offset)
+    key = str(channel.id)
+    store.set_testers(key, [])
+    store.set_queue_gamemode(key, gamemode)
+    store.set_queue_region(key, region)
+    store.bind_message(key, next(_ids))
+    return channel
+
+
+async def bench_queue_buttons(bot, scale, ops, rng):
+    store = _reset_queue_store(make_waitlist(scale, rng))
+    channel = _queue_channel(bot, store)
+    view = waitlist_cog.get_queue_view()
+    button = None
+    users = [FakeUser(next(_ids), roles=(QUEUE_ROLE,)) for _ in range(ops)]
+
+    async def join(i):
+        await waitlist_cog.QueueView.join(view, FakeInteraction(bot, users[i], channel), button)
+
+    async def leave(i):
+        await waitlist_cog.QueueView.leave(view, FakeInteraction(bot, users[i], channel), button)
+
+    results = [await Scenario("queue_join", scale).run(join, ops)]
+    if len(waitlist_cog.get_testers_for_queue(channel.id)) != ops:
+        raise RuntimeError("Join did not add every tester")
+    results.append(await Scenario("queue_leave", scale).run(leave, ops))
+    edits = channel.edits
+    await _finish_queue_store(store)
+    if channel.edits == edits:
+        raise RuntimeError("Join/leave never edited the queue embed")
+    return results
+
+
+async def bench_queue_embed(bot, scale, ops, rng):
+    store = _reset_queue_store(make_waitlist(scale, rng))
+    channel = _queue_channel(bot, store)
+    channel_key = str(channel.id)
+    tester = next(_ids)
+
+    async def prepare(i):
+        # Alternate a visible change so every edit has new content to send
+        if i % 2:
+            store.remove_tester(channel_key, tester)
+        else:
+            store.add_tester(channel_key, tester)
+
+    async def edit(i):
+        await waitlist_cog._edit_queue_message(bot, channel_key)
+
+    edits = channel.edits
+    result = await Scenario("queue_embed", scale).run(edit, ops, prepare=prepare)
+    edits = channel.edits - edits
+    await _finish_queue_store(store)
+    if edits != ops:
+        raise RuntimeError(f"Queue embed was edited {edits} of {ops} times")
+    return [result]
+
+
+async def bench_waitlist_modal(bot, scale, ops, rng):
+    store = _reset_queue_store(make_waitlist(scale, rng))
+    channel = _queue_channel(bot, store)
+    modals = []
+    for i in range(ops):
+        user_id = next(_ids)
+        modal = waitlist_cog.WaitlistModal(user_id)
+        modal.ign._value = f"newplayer{user_id}"
+        modal.gamemode._value = rng.choice(GAMEMODES)
+        modal.region._value = rng.choice(REGIONS) or ""
+        modals.append((modal, FakeUser(user_id)))
+
+    async def submit(i):
+        modal, user = modals[i]
+        await modal.on_submit(FakeInteraction(bot, user, channel))
+
+    result = await Scenario("waitlist_modal", scale).run(submit, ops)
+    if len(store.waitlist) != scale + ops:
+        raise RuntimeError("WaitlistModal did not enqueue every entry")
+    await _finish_queue_store(store)
+    return [result]
+
+
+async def bench_matchmake(bot, scale, ops, rng):
+    store = _reset_queue_store(make_waitlist(scale, rng))
+    waitlist_cog.matchmaker.bot = bot
+    channels = [_queue_channel(bot, store, gamemode, offset=n) for n, gamemode in enumerate(GAMEMODES)]
+    channels.append(_queue_channel(bot, store, None, offset=len(GAMEMODES)))
+    refill = iter(make_waitlist(scale + ops, rng)[scale:])
+
+    async def prepare(i):
+        # One free tester per pass, and the waitlist topped back up to its size
+        store.add_tester(str(rng.choice(channels).id), next(_ids))
+        while len(store.waitlist) < scale:
+            store.enqueue(next(refill))
+
+    async def matchmake(i):
+        await waitlist_cog.try_matchmake(bot)
+
+    dispatched = bot.dispatched
+    result = await Scenario("matchmake", scale).run(matchmake, ops, prepare=prepare)
+    # A tester can stay free when nobody waiting plays that channel's gamemode
+    free = sum(len(waitlist_cog.get_testers_for_queue(channel.id)) for channel in channels)
+    if bot.dispatched - dispatched + free != ops:
+        raise RuntimeError(f"try_matchmake made {bot.dispatched - dispatched} match(es) for {ops} tester(s)")
+    await _finish_queue_store(store)
+    return [result]
+
+
+async def bench_settier(bot, scale, ops, rng):
+    tierlist.backend = usermeta.backend = get_backend()
+    tierlist.load_from(make_tierlist(scale, rng))
+    usermeta.load_from(make_usermeta(min(USERMETA_USERS, scale)))
+    cog = SetTier(bot)
+    admin = FakeUser(next(_ids))
+    channel = bot.channel(QUEUE_CHANNEL)
+    picks = []
+    for _ in range(ops):
+        ign = f"player{rng.randrange(scale)}"
+        # The IGN's current owner (or a fresh user), so the common no-override path is measured
+        owner = usermeta.discord_for_ign(ign) or str(next(_ids))
+        gamemode = next(iter(tierlist.profile(ign)), GAMEMODES[0])
+        picks.append((FakeUser(int(owner)), ign, rng.choice(TIERS), gamemode))
+
+    async def settier(i):
+        user, ign, tier, gamemode = picks[i]
+        await SetTier.settier.callback(cog, FakeInteraction(bot, admin, channel), user, ign, tier, gamemode)
+
+    # Write-behind flushes count toward throughput
+    return [await Scenario("settier", scale).run(settier, ops, settle=cog.cog_unload)]
+
+
+async def bench_results(bot, ops, rng):
+    cog = Results(bot)
+    results_channel = bot.channel(RESULTS_CHANNEL)
+    tester = FakeUser(next(_ids), roles=(RESULTS_ROLE,))
+    channel = bot.channel(QUEUE_CHANNEL)
+
+    async def post(i):
+        player = FakeUser(USER_BASE + i)
+        await Results.results.callback(cog, FakeInteraction(bot, tester, channel), tester, player,
+                                       f"player{i}", "PC", rng.choice(TIERS), rng.choice(TIERS), rng.choice(GAMEMODES))
+
+    result = await Scenario("results", None).run(post, ops)
+    if results_channel.sent != ops:
+        raise RuntimeError(f"/results posted {results_channel.sent} of {ops} embeds")
+    return [result]
+
+
+SCENARIOS = ("queue_buttons", "queue_embed", "waitlist_modal", "matchmake", "settier", "results")
+
+
+async def run_suite(waitlist_scales, tierlist_scales, ops, only=None, seed=0):
+    rng = random.Random(seed)
+    bot = FakeBot()
+    settings_service.save({
+        "results_channel": RESULTS_CHANNEL,
+        "results_roles": [RESULTS_ROLE],
+        "queue_role": QUEUE_ROLE,
+    })
+    selected = [name for name in SCENARIOS if not only or name in only]
+    results = []
+    for name in selected:
+        if name == "results":
+            results += await bench_results(bot, ops, rng)
+            continue
+        bench = {"queue_buttons": bench_queue_buttons, "queue_embed": bench_queue_embed,
+                 "waitlist_modal": bench_waitlist_modal,
+                 "matchmake": bench_matchmake, "settier": bench_settier}[name]
+        for scale in (tierlist_scales if name == "settier" else waitlist_scales):
+            for result in await bench(bot, scale, ops, rng):
+                _print_progress(result)
+                results.append(result)
+    await pipeline.close()
+    await outbound.close()
+    return results
+
+
+def _print_progress(result):
+    print(f"  done {result['scenario']} @ {result['scale']}", file=sys.stderr, flush=True)
+
+
+def _git_describe():
+    try:
+        return subprocess.run(["git", "describe", "--tags", "--always", "--dirty"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _result_key(result):
+    return result["scenario"] if result["scale"] is None else f"{result['scenario']}@{result['scale']}"
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Returns ``[(key, metric, old, new, change)]`` for every scenario outside ``tolerance``."""
+    old = {_result_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = old.get(_result_key(result))
+        if before is None or before["ops"] != result["ops"]:
+            # Not run, or not run the same way; warm-up makes short runs incomparable
+            continue
+        if before["ops_per_sec"] and result["ops_per_sec"] < before["ops_per_sec"] * (1 - tolerance):
+            change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+            regressions.append((_result_key(result), "ops_per_sec", before["ops_per_sec"], result["ops_per_sec"], change))
+        if before["p99_ms"] and result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            change = result["p99_ms"] / before["p99_ms"] - 1
+            regressions.append((_result_key(result), "p99_ms", before["p99_ms"], result["p99_ms"], change))
+    return regressions
+
+
+def _load_baseline(name):
+    path = name if os.path.exists(name) else os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="small scales and fewer operations")
+    parser.add_argument("--ops", type=int, help=f"operations per scenario (default {OPS}, {QUICK_OPS} with --quick)")
+    parser.add_argument("--only", action="append", choices=SCENARIOS, help="run only this scenario (repeatable)")
+    parser.add_argument("--rest-delay", type=float, default=0.0, help="simulated seconds per fake REST call")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--save", nargs="?", const="", metavar="LABEL",
+                        help="store the report in benchmarks/results/LABEL.json (default: git describe)")
+    parser.add_argument("--compare", metavar="RUN", help="stored run (path or label) to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed fractional slowdown")
+    args = parser.parse_args()
+
+    global REST_DELAY
+    REST_DELAY = args.rest_delay
+    waitlist_scales = QUICK_WAITLIST_SCALES if args.quick else WAITLIST_SCALES
+    tierlist_scales = QUICK_TIERLIST_SCALES if args.quick else TIERLIST_SCALES
+    ops = args.ops or (QUICK_OPS if args.quick else OPS)
+
+    with tempfile.TemporaryDirectory(prefix="ectiers-bench-") as scratch:
+        os.makedirs(os.path.join(scratch, "data"))
+        # Every storage path is relative to data/, so the run never touches the real files
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        try:
+            settings_service.invalidate()
+            results = asyncio.run(run_suite(waitlist_scales, tierlist_scales, ops, args.only, args.seed))
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "version": _git_describe(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "storage": get_backend().name,
+        "ops": ops,
+        "rest_delay": args.rest_delay,
+        "results": results,
+    }
+    if args.save is not None:
+        label = args.save or report["version"] or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{label}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {path}", file=sys.stderr)
+    regressions = compare(report, _load_baseline(args.compare), args.tolerance) if args.compare else []
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['version'] or 'unversioned'} on Python {report['python']} ({report['storage']} storage), "
+              f"{ops} ops per scenario")
+        print(f"{'scenario':<16}{'scale':>10}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for result in results:
+            scale = "-" if result["scale"] is None else f"{result['scale']:,}"
+            print(f"{result['scenario']:<16}{scale:>10}{result['ops_per_sec']:>12,.0f}"
+                  f"{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}")
+    if args.compare:
+        if not regressions:
+            print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+        for key, metric, before, after, change in regressions:
+            print(f"REGRESSION {key} {metric}: {before:,.3f} -> {after:,.3f} ({change:+.0%})")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Import-time profile for the bot entry point.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter (so
+nothing is already cached in ``sys.modules``), then reports the total cold
+import time, the slowest top-level packages, and how long
+``importlib.reload(main)`` takes, which is what the Streamlit panel does
+before every start.
+
+Usage (from the project root):
+
+    python benchmarks/importtime.py            # human-readable report
+    python benchmarks/importtime.py --top 25   # show more packages
+    python benchmarks/importtime.py --json     # machine-readable, for tracking over time
+
+Optional integrations (streamlit, tomli, dotenv) should not show up in a
+headless run; the report flags them if they do.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+# Packages that must stay out of a headless import of main
+LAZY_PACKAGES = ("streamlit", "tomli", "dotenv")
+RELOAD_ROUNDS = 5
+
+_RELOAD_SNIPPET = """
+import importlib, json, time
+import main
+samples = []
+for _ in range(%d):
+    started = time.perf_counter()
+    importlib.reload(main)
+    samples.append(time.perf_counter() - started)
+print(json.dumps(samples))
+"""
+
+
+def _run(code, importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", code]
+    return subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+
+
+def parse_importtime(stderr):
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return modules
+
+
+def profile(top=15):
+    proc = _run("import main", importtime=True)
+    modules = parse_importtime(proc.stderr)
+    total_us = sum(self_us for _, self_us, _, _ in modules)
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    reload_samples = json.loads(_run(_RELOAD_SNIPPET % RELOAD_ROUNDS).stdout.strip().splitlines()[-1])
+    loaded = {name.split(".")[0] for name, _, _, _ in modules}
+    return {
+        "python": sys.version.split()[0],
+        "modules": len(modules),
+        "total_ms": total_us / 1000.0,
+        "main_cumulative_ms": next((cum / 1000.0 for name, _, cum, _ in modules if name == "main"), None),
+        "top_packages_ms": {name: us / 1000.0 for name, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]},
+        "reload_ms": {"min": min(reload_samples) * 1000.0, "max": max(reload_samples) * 1000.0},
+        "unexpected_lazy_imports": sorted(loaded.intersection(LAZY_PACKAGES)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="number of packages to list")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    report = profile(args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"Python {report['python']}: {report['modules']} modules imported")
+    print(f"Cold import of main: {report['main_cumulative_ms']:.1f} ms (all imports: {report['total_ms']:.1f} ms)")
+    print(f"importlib.reload(main): {report['reload_ms']['min']:.2f}-{report['reload_ms']['max']:.2f} ms over {RELOAD_ROUNDS} rounds")
+    print("Slowest top-level packages (self time):")
+    for name, ms in report["top_packages_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+    if report["unexpected_lazy_imports"]:
+        print(f"WARNING: optional packages imported at startup: {', '.join(report['unexpected_lazy_imports'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,33 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-import os
+from storage.settings import settings as settings_service
+from services.pipeline import ack, pipeline
+from services.outbound import PRIORITY_POST, channel_route, outbound
+from services.logs import get_logger
+from services.metrics import instrument
 
-SETTINGS_FILE = "data/settings.json"
+log = get_logger("results")
 
-def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+async def load_settings():
+    return (await settings_service.aget()).raw
 
-def save_settings(settings):
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=2)
+async def save_settings(settings):
+    await settings_service.asave(settings)
+
+async def update_settings(changes):
+    # Read-modify-write in one job; run it under key="settings" so concurrent /setup calls don't overwrite each other
+    settings = dict(await load_settings())
+    settings.update(changes)
+    await save_settings(settings)
 
 class Results(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.settings = load_settings()
+
+    async def cog_unload(self):
+        await pipeline.drain()
+        await outbound.drain()
 
     @app_commands.command(name="setup", description="Setup a command's configuration (admin only)")
     @app_commands.describe(
@@ -29,14 +37,17 @@ class Results(commands.Cog):
         role="Role allowed to use Join/Leave for createqueue (mention or name)",
         category="Category channel for ticket creation (mention)"
     )
+    @instrument("command", "setup")
     async def setup(self, interaction: discord.Interaction, command: str, channel: discord.TextChannel = None, roles: str = None, role: discord.Role = None, category: discord.CategoryChannel = None):
         # Only allow admins to use this command
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("You must be an administrator to use this command.", ephemeral=True)
             return
+        # Only the changed keys are collected here; they are merged into the latest settings when saved
+        changes = {}
         if command.lower() == "results":
             if channel is not None:
-                self.settings['results_channel'] = channel.id
+                changes['results_channel'] = channel.id
             if roles is not None:
                 allowed_role_ids = []
                 for r in roles.split(','):
@@ -51,16 +62,16 @@ class Results(commands.Cog):
                         role_obj = discord.utils.find(lambda role: role.name.lower() == r.lower(), interaction.guild.roles)
                         if role_obj:
                             allowed_role_ids.append(role_obj.id)
-                self.settings['results_roles'] = allowed_role_ids
-            save_settings(self.settings)
-            await interaction.response.send_message(f"/results command configured. Channel: {channel.mention if channel else 'unchanged'}, Roles: {roles if roles else 'unchanged'}", ephemeral=True)
+                changes['results_roles'] = allowed_role_ids
+            await ack(interaction, f"/results command configured. Channel: {channel.mention if channel else 'unchanged'}, Roles: {roles if roles else 'unchanged'}")
+            pipeline.submit(update_settings(changes), key="settings")
         elif command.lower() == "createqueue":
             if role is not None:
-                self.settings['queue_role'] = role.id
+                changes['queue_role'] = role.id
             if category is not None:
-                self.settings['queue_category'] = category.id
-            save_settings(self.settings)
-            await interaction.response.send_message(f"/createqueue configured. Role: {role.mention if role else 'unchanged'}, Category: {category.mention if category else 'unchanged'}", ephemeral=True)
+                changes['queue_category'] = category.id
+            await ack(interaction, f"/createqueue configured. Role: {role.mention if role else 'unchanged'}, Category: {category.mention if category else 'unchanged'}")
+            pipeline.submit(update_settings(changes), key="settings")
         else:
             await interaction.response.send_message(f"Unknown command '{command}'.", ephemeral=True)
 
@@ -74,6 +85,7 @@ class Results(commands.Cog):
         new_tier="New tier",
         gamemode="Gamemode (e.g., Mace)"
     )
+    @instrument("command", "results")
     async def results(self, interaction: discord.Interaction,
                       tester: discord.User,
                       discord_user: discord.User,
@@ -82,17 +94,17 @@ class Results(commands.Cog):
                       previous_tier: str,
                       new_tier: str,
                       gamemode: str):
-        # Reload settings to reflect any changes made via the web config
-        self.settings = load_settings()
+        # Shared snapshot; picks up web config changes without re-reading the file here
+        settings = await settings_service.aget()
         # Check if channel and roles are set
-        channel_id = self.settings.get('results_channel')
-        allowed_role_ids = self.settings.get('results_roles')
+        channel_id = settings.results_channel
+        allowed_role_ids = settings.results_roles
         # If roles are set, check if user has one of the allowed role IDs
         if allowed_role_ids:
             user_role_ids = [role.id for role in interaction.user.roles]
-            print("User role IDs:", user_role_ids)
-            print("Allowed role IDs:", allowed_role_ids)
-            if not any(role_id in allowed_role_ids for role_id in user_role_ids):
+            # Lazy %-args: nothing is formatted unless DEBUG is enabled
+            log.debug("Role check: user roles %s, allowed roles %s", user_role_ids, allowed_role_ids)
+            if allowed_role_ids.isdisjoint(user_role_ids):
                 await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
                 return
         embed = discord.Embed(
@@ -112,8 +124,9 @@ class Results(commands.Cog):
         if channel_id:
             channel = interaction.guild.get_channel(channel_id)
             if channel:
-                await channel.send(embed=embed)
-                await interaction.response.send_message(f"Result posted in {channel.mention}", ephemeral=True)
+                # Ack straight away; the post goes out through the outbound scheduler ahead of embed refreshes
+                await ack(interaction, f"Result posted in {channel.mention}")
+                outbound.submit(channel_route(channel.id), lambda: channel.send(embed=embed), priority=PRIORITY_POST)
             else:
                 await interaction.response.send_message("Configured results channel not found or I lack permission to post there.", ephemeral=True)
             return
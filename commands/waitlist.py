@@ -1,195 +1,221 @@
+import asyncio
+import time
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-import os
 from datetime import datetime, timezone
-import tempfile
+from storage.jsonio import run_io
+from storage.queue_store import QueueStore
+from storage.settings import aget_settings
+from services.embed_updates import EmbedUpdateScheduler
+from services.concurrency import InteractionDeduper, KeyedLocks
+from services.matchmaking import Matchmaker
+from services.pipeline import ack, pipeline, record_ack
+from services.logs import get_logger
+from services.metrics import instrument
+from services.outbound import PRIORITY_EMBED, PRIORITY_INTERACTION, PRIORITY_POST, channel_route, interaction_route, outbound
 
-WAITLIST_PATH = os.path.join("data", "currentwaitlist.json")
-SETTINGS_PATH = os.path.join("data", "settings.json")
-QUEUE_STATE_PATH = os.path.join("data", "queue_state.json")
+log = get_logger("waitlist")
 
-# Load or initialize queue state
-if os.path.exists(QUEUE_STATE_PATH):
-    with open(QUEUE_STATE_PATH, 'r') as f:
-        try:
-            queue_state = json.load(f)
-        except Exception:
-            queue_state = {}
-else:
-    queue_state = {}
-
-def save_queue_state():
-    with open(QUEUE_STATE_PATH, 'w') as f:
-        json.dump(queue_state, f, indent=2)
+# Single in-memory copy of the waitlist and queue state, loaded when the cog is set up
+store = QueueStore()
 
 def get_queue_key(channel_id):
     return str(channel_id)
 
 def get_testers_for_queue(channel_id):
     key = get_queue_key(channel_id)
-    return queue_state.get(key, {}).get('testers', [])
+    return store.queue_state.get(key, {}).get('testers', [])
 
 def set_testers_for_queue(channel_id, testers):
     key = get_queue_key(channel_id)
-    if key not in queue_state:
-        queue_state[key] = {}
-    queue_state[key]['testers'] = testers
-    save_queue_state()
+    store.set_testers(key, testers)
 
 def set_queue_message(channel_id, message_id):
     key = get_queue_key(channel_id)
-    if key not in queue_state:
-        queue_state[key] = {}
-    queue_state[key]['message_id'] = message_id
-    save_queue_state()
+    store.bind_message(key, message_id)
 
 def get_queue_message(channel_id):
     key = get_queue_key(channel_id)
-    return queue_state.get(key, {}).get('message_id')
+    return store.queue_state.get(key, {}).get('message_id')
 
-async def update_queue_message(bot, channel_id):
-    print(f"[update_queue_message] Called for channel_id={channel_id}")
-    # Load settings and waitlist
-    if os.path.exists(SETTINGS_PATH):
-        with open(SETTINGS_PATH, 'r') as f:
-            settings = json.load(f)
-    else:
-        print("[update_queue_message] No settings found.")
-        return
-    allowed_role_id = settings.get("queue_role")
-    if allowed_role_id is not None:
-        allowed_role_id = int(allowed_role_id)
-    if os.path.exists(WAITLIST_PATH):
-        with open(WAITLIST_PATH, 'r') as f:
-            try:
-                waitlist = json.load(f)
-            except Exception as e:
-                print(f"[update_queue_message] Failed to load waitlist: {e}")
-                waitlist = []
-    else:
-        waitlist = []
-    # Players section
-    players = [entry["ign"] for entry in waitlist]
-    players_lines = [f"{i+1}. {players[i] if i < len(players) else ''}" for i in range(10)]
-    # Testers section
-    testers = get_testers_for_queue(channel_id)
-    testers_lines = []
-    for i in range(3):
-        if i < len(testers):
-            user_id = testers[i]
-            testers_lines.append(f"{i+1}. <@{user_id}>")
-        else:
-            testers_lines.append(f"{i+1}.")
-    embed = discord.Embed(
-        title="Testing Queue - DEFAULT",
-        description="Please use the command /join to join the DEFAULT queue\n\n**Players:**\n" + "\n".join(players_lines) + "\n\n**Testers**\n" + "\n".join(testers_lines),
-        color=discord.Color.purple()
-    )
+def get_queue_gamemode(channel_id):
+    # None means a DEFAULT queue that serves every gamemode
+    key = get_queue_key(channel_id)
+    return store.queue_state.get(key, {}).get('gamemode')
+
+def _format_players(entries, slots=10):
+    players = [entry["ign"] for entry in entries]
+    return [f"{i+1}. {players[i] if i < len(players) else ''}" for i in range(slots)]
+
+def _format_testers(testers, slots=3):
+    return [f"{i+1}. <@{testers[i]}>" if i < len(testers) else f"{i+1}." for i in range(slots)]
+
+# channel_id -> (store.version, title, description)
+_render_cache = {}
+# channel_id -> (message_id, title, description) last written to Discord
+_last_sent = {}
+
+def render_queue_content(channel_id):
+    """Title and description of a queue embed, cached per channel on the store version."""
+    channel_id = str(channel_id)
+    cached = _render_cache.get(channel_id)
+    if cached is not None and cached[0] == store.version:
+        return cached[1], cached[2]
+    gamemode = get_queue_gamemode(channel_id)
+    queue_name = gamemode or "DEFAULT"
+    # Players section: only the head of this channel's gamemode queue is shown
+    players_lines = _format_players(store.waitlist.entries(gamemode, limit=10))
+    testers_lines = _format_testers(get_testers_for_queue(channel_id))
+    region = store.queue_state.get(channel_id, {}).get('region')
+    title = f"Testing Queue - {queue_name}" + (f" ({region})" if region else "")
+    description = f"Please use the command /join to join the {queue_name} queue\n\n**Players:**\n" + "\n".join(players_lines) + "\n\n**Testers**\n" + "\n".join(testers_lines)
+    _render_cache[channel_id] = (store.version, title, description)
+    return title, description
+
+def build_queue_embed(title, description):
+    embed = discord.Embed(title=title, description=description, color=discord.Color.purple())
     embed.set_thumbnail(url="https://i.imgur.com/your-image.png")
     embed.timestamp = datetime.now(timezone.utc)
-    # Edit the message
+    return embed
+
+_queue_view = None
+
+def get_queue_view():
+    # One persistent view instance shared by registration and every edit
+    global _queue_view
+    if _queue_view is None:
+        _queue_view = QueueView()
+    return _queue_view
+
+async def update_queue_message(bot, channel_id):
+    # Coalesced: bursts of calls for one channel become a single edit of the latest state
+    log.debug("Queue embed update requested for channel %s", channel_id)
+    embed_updates.request(bot, channel_id)
+
+async def _edit_queue_message(bot, channel_id):
     message_id = get_queue_message(channel_id)
-    print(f"[update_queue_message] message_id={message_id}")
-    if message_id:
-        channel = bot.get_channel(int(channel_id))
-        print(f"[update_queue_message] Editing message in channel={channel}")
-        if channel:
-            try:
-                msg = await channel.fetch_message(int(message_id))
-                await msg.edit(embed=embed, view=QueueView())
-                print(f"[update_queue_message] Successfully edited message {message_id}")
-            except Exception as e:
-                print(f"[update_queue_message] Failed to edit message: {e}")
-
-async def try_matchmake(bot, channel_id):
-    print(f"[try_matchmake] Called for channel_id={channel_id}")
-    # Load settings and waitlist
-    if os.path.exists(SETTINGS_PATH):
-        with open(SETTINGS_PATH, 'r') as f:
-            settings = json.load(f)
-    else:
-        print("[try_matchmake] No settings found.")
+    if not message_id:
         return
-    category_id = settings.get("queue_category")
-    if category_id is not None:
-        category_id = int(category_id)
-    allowed_role_id = settings.get("queue_role")
-    if allowed_role_id is not None:
-        allowed_role_id = int(allowed_role_id)
-    staff_role_id = settings.get("staff_role") if "staff_role" in settings else None
-    if staff_role_id is not None:
-        staff_role_id = int(staff_role_id)
-    if os.path.exists(WAITLIST_PATH):
-        with open(WAITLIST_PATH, 'r') as f:
-            try:
-                waitlist = json.load(f)
-            except Exception as e:
-                print(f"[try_matchmake] Failed to load waitlist: {e}")
-                waitlist = []
-    else:
-        waitlist = []
-    testers = get_testers_for_queue(channel_id)
-    print(f"[try_matchmake] testers={testers}, waitlist={waitlist}")
-    if not waitlist or not testers:
-        print("[try_matchmake] Not enough players or testers.")
+    title, description = render_queue_content(channel_id)
+    if _last_sent.get(channel_id) == (message_id, title, description):
+        # Nothing visible changed since the last edit; skip the API call
+        return
+    msg = embed_updates.message(bot, channel_id, message_id)
+    log.debug("Editing queue message %s in channel %s", message_id, channel_id)
+
+    async def send():
+        try:
+            await msg.edit(embed=build_queue_embed(title, description), view=get_queue_view())
+        except discord.NotFound as e:
+            embed_updates.forget(channel_id)
+            log.warning("Queue message %s in channel %s is gone: %s", message_id, channel_id, e)
+            return
+        _last_sent[channel_id] = (message_id, title, description)
+        log.debug("Edited queue message %s", message_id)
+
+    # Lowest priority; an edit still waiting in the outbound queue is replaced by this one
+    try:
+        await outbound.submit(channel_route(channel_id), send, priority=PRIORITY_EMBED, coalesce=("queue_embed", channel_id))
+    except Exception as e:
+        log.warning("Failed to edit queue message %s in channel %s: %s", message_id, channel_id, e)
+
+# Per-channel debounced scheduler for queue embed edits
+embed_updates = EmbedUpdateScheduler(_edit_queue_message)
+
+def refresh_queue_messages(bot):
+    # Player lists can change in any channel; unchanged embeds are skipped by the renderer
+    for channel_key, queue in store.queue_state.items():
+        if queue.get('message_id'):
+            embed_updates.request(bot, channel_key)
+
+# Queue channels re-rendered at once when rehydrating after startup or a gateway resume
+REHYDRATE_CONCURRENCY = 8
+
+async def rehydrate_queue_messages(bot, concurrency=REHYDRATE_CONCURRENCY):
+    # Re-render every bound queue embed now (no debounce), warming the PartialMessage cache on the way
+    bound = [channel_key for channel_key, queue in store.queue_state.items() if queue.get('message_id')]
+    if not bound:
         return
-    # Pop first player and tester
-    player_entry = waitlist.pop(0)
-    tester_id = testers.pop(0)
-    set_testers_for_queue(channel_id, testers)
-    atomic_write_json(WAITLIST_PATH, waitlist)
-    # Update queue embed
-    await update_queue_message(bot, channel_id)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def rehydrate(channel_key):
+        async with semaphore:
+            # An edit sent just before a disconnect may never have landed; don't trust _last_sent
+            _last_sent.pop(channel_key, None)
+            await _edit_queue_message(bot, channel_key)
+
+    started = time.monotonic()
+    await asyncio.gather(*(rehydrate(channel_key) for channel_key in bound), return_exceptions=True)
+    log.info("Refreshed %d queue embed(s) in %.2fs", len(bound), time.monotonic() - started)
+
+# Queue mutations for a channel run one at a time; double-clicks are handled once
+queue_locks = KeyedLocks()
+click_dedupe = InteractionDeduper()
+
+# Background matchmaker across all queue channels; bound to the bot in Waitlist.cog_load
+matchmaker = Matchmaker(None, store, on_changed=lambda channel_keys: refresh_queue_messages(matchmaker.bot), locks=queue_locks)
+
+async def _join_testers(bot, channel_id, user_id):
+    async with queue_locks.hold(channel_id):
+        changed = store.add_tester(get_queue_key(channel_id), user_id)
+    if changed:
+        await update_queue_message(bot, channel_id)
+        matchmaker.poke()
+
+async def _leave_testers(bot, channel_id, user_id):
+    async with queue_locks.hold(channel_id):
+        changed = store.remove_tester(get_queue_key(channel_id), user_id)
+    if changed:
+        await update_queue_message(bot, channel_id)
+
+async def try_matchmake(bot, channel_id=None):
+    # Runs one matchmaking pass now instead of waiting for the next tick; returns the matches made
+    log.debug("Matchmaking pass requested for channel %s", channel_id)
+    return await matchmaker.run_pass()
 
 class QueueView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="Join", style=discord.ButtonStyle.success, custom_id="queue_join")
+    @instrument("button", "queue_join")
     async def join(self, interaction: discord.Interaction, button: discord.ui.Button):
         channel_id = str(interaction.channel.id)
-        print(f"[QueueView] Join button pressed by user {interaction.user.id} in channel {channel_id}")
-        # Load allowed_role_id from settings
-        allowed_role_id = None
-        if os.path.exists(SETTINGS_PATH):
-            with open(SETTINGS_PATH, 'r') as f:
-                settings = json.load(f)
-                allowed_role_id = settings.get("queue_role")
-        if allowed_role_id is not None:
-            allowed_role_id = int(allowed_role_id)
+        log.debug("Join pressed by user %s in channel %s", interaction.user.id, channel_id)
+        if click_dedupe.is_duplicate(interaction.user.id, "queue_join", channel_id):
+            await ack(interaction, "Already handled your last click.")
+            return
+        allowed_role_id = (await aget_settings()).queue_role
         if allowed_role_id and allowed_role_id not in [role.id for role in interaction.user.roles]:
-            print(f"[QueueView] User {interaction.user.id} not allowed to join as tester.")
-            await interaction.response.send_message("You are not allowed to join as a tester.", ephemeral=True)
+            log.info("User %s not allowed to join as tester", interaction.user.id)
+            await ack(interaction, "You are not allowed to join as a tester.")
             return
-        testers = get_testers_for_queue(channel_id)
-        if interaction.user.id not in testers:
-            testers.append(interaction.user.id)
-            set_testers_for_queue(channel_id, testers)
-        await update_queue_message(interaction.client, channel_id)
-        await try_matchmake(interaction.client, channel_id)
-        await interaction.response.send_message("You joined as a tester!", ephemeral=True)
+        # Ack first; the queue mutation and embed refresh run in the background pipeline
+        await ack(interaction, "You joined as a tester!")
+        pipeline.submit(_join_testers(interaction.client, channel_id, interaction.user.id), key=channel_id)
 
     @discord.ui.button(label="Leave", style=discord.ButtonStyle.danger, custom_id="queue_leave")
+    @instrument("button", "queue_leave")
     async def leave(self, interaction: discord.Interaction, button: discord.ui.Button):
         channel_id = str(interaction.channel.id)
-        print(f"[QueueView] Leave button pressed by user {interaction.user.id} in channel {channel_id}")
-        testers = get_testers_for_queue(channel_id)
-        if interaction.user.id in testers:
-            testers.remove(interaction.user.id)
-            set_testers_for_queue(channel_id, testers)
-        await update_queue_message(interaction.client, channel_id)
-        await interaction.response.send_message("You left the tester queue.", ephemeral=True)
+        log.debug("Leave pressed by user %s in channel %s", interaction.user.id, channel_id)
+        if click_dedupe.is_duplicate(interaction.user.id, "queue_leave", channel_id):
+            await ack(interaction, "Already handled your last click.")
+            return
+        await ack(interaction, "You left the tester queue.")
+        pipeline.submit(_leave_testers(interaction.client, channel_id, interaction.user.id), key=channel_id)
 
 class WaitlistModal(discord.ui.Modal, title="Join Waitlist"):
     ign = discord.ui.TextInput(label="Minecraft IGN", placeholder="Enter your Minecraft username", required=True)
     gamemode = discord.ui.TextInput(label="Gamemode", placeholder="e.g., Sword, Mace, Crystal", required=True)
+    region = discord.ui.TextInput(label="Region", placeholder="e.g., AS, EU, NA", required=False)
 
     def __init__(self, user_id):
         super().__init__()
         self.user_id = user_id
 
+    @instrument("modal", "waitlist")
     async def on_submit(self, interaction: discord.Interaction):
         entry = {
             "discord_id": str(self.user_id),
@@ -197,37 +223,92 @@ class WaitlistModal(discord.ui.Modal, title="Join Waitlist"):
             "gamemode": self.gamemode.value.strip(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
-        if os.path.exists(WAITLIST_PATH):
-            with open(WAITLIST_PATH, 'r') as f:
-                try:
-                    waitlist = json.load(f)
-                except Exception:
-                    waitlist = []
-        else:
-            waitlist = []
-        waitlist.append(entry)
-        atomic_write_json(WAITLIST_PATH, waitlist)
-        await interaction.response.send_message(f"You have been added to the waitlist! (IGN: {self.ign.value}, Gamemode: {self.gamemode.value})", ephemeral=True)
+        if self.region.value and self.region.value.strip():
+            entry["region"] = self.region.value.strip().upper()
+        # The enqueue itself is an O(1) in-memory change; persistence is already write-behind
+        if not store.enqueue(entry):
+            existing = store.waitlist.get(entry["discord_id"])
+            position = store.waitlist.position(entry["discord_id"])
+            await ack(interaction, f"You are already on the waitlist (IGN: {existing['ign']}, Gamemode: {existing['gamemode']}, position {position}).")
+            return
+        position = store.waitlist.position(entry["discord_id"])
+        await ack(interaction, f"You have been added to the waitlist! (IGN: {self.ign.value}, Gamemode: {self.gamemode.value}, position {position})")
+        refresh_queue_messages(interaction.client)
+        matchmaker.poke()
 
 class WaitlistView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=60)
 
     @discord.ui.button(label="✅ Verify Account Details", style=discord.ButtonStyle.success)
+    @instrument("button", "waitlist_verify")
     async def verify(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_message("Account verification coming soon!", ephemeral=True)
+        await ack(interaction, "Account verification coming soon!")
 
     @discord.ui.button(label="Join Waitlist", style=discord.ButtonStyle.success)
+    @instrument("button", "waitlist_join")
     async def join(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(WaitlistModal(interaction.user.id))
+        record_ack(interaction)
 
 class Waitlist(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._rehydrate_task = None
         # Register persistent view ONCE in on_ready, not here
         # (moved to main.py)
 
+    def _start_rehydrate(self):
+        # on_ready can fire again on reconnect; never run two rehydrations side by side
+        if self._rehydrate_task is None or self._rehydrate_task.done():
+            self._rehydrate_task = asyncio.get_running_loop().create_task(
+                rehydrate_queue_messages(self.bot), name="QueueRehydrate")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self._start_rehydrate()
+
+    @commands.Cog.listener()
+    async def on_resumed(self):
+        # Edits may have failed while the gateway was down
+        self._start_rehydrate()
+
+    async def cog_load(self):
+        # Load once; every interaction afterwards reads from memory
+        if not store.loaded:
+            await run_io(store.load)
+        store.start()
+        matchmaker.bot = self.bot
+        matchmaker.start()
+
+    async def cog_unload(self):
+        # Finish queued side effects, then write out anything still pending before the bot goes away
+        if self._rehydrate_task is not None:
+            self._rehydrate_task.cancel()
+        # close(), not drain(): workers belong to this event loop and a restart gets a new one
+        await pipeline.close()
+        await matchmaker.close()
+        await outbound.close()
+        await embed_updates.close()
+        await store.close()
+
+    @commands.Cog.listener()
+    async def on_queue_match(self, match):
+        # Default notification: ping both sides in the queue channel
+        channel = self.bot.get_channel(int(match.channel_id))
+        if channel is None:
+            log.warning("Match in unknown channel %s: %s", match.channel_id, match)
+            return
+        player = match.player
+        content = (f"<@{player['discord_id']}> you have been matched with tester <@{match.tester_id}> "
+                   f"(IGN: {player['ign']}, Gamemode: {player['gamemode']}{', Region: ' + player['region'] if player.get('region') else ''}).")
+        try:
+            await outbound.submit(channel_route(channel.id), lambda: channel.send(content), priority=PRIORITY_POST)
+        except Exception as e:
+            log.warning("Failed to announce match %s: %s", match, e)
+
     @app_commands.command(name="waitlist", description="Apply to the tierlist waitlist")
+    @instrument("command", "waitlist")
     async def waitlist(self, interaction: discord.Interaction):
         embed = discord.Embed(
             title="Tierlist APP",
@@ -241,60 +322,42 @@ class Waitlist(commands.Cog):
             color=discord.Color.purple()
         )
         embed.set_thumbnail(url="https://i.imgur.com/your-image.png")
-        await interaction.response.send_message(embed=embed, view=WaitlistView())
+        await ack(interaction, embed=embed, view=WaitlistView(), ephemeral=False)
 
     @app_commands.command(name="createqueue", description="Create a testing queue embed")
-    async def createqueue(self, interaction: discord.Interaction):
-        if os.path.exists(SETTINGS_PATH):
-            with open(SETTINGS_PATH, 'r') as f:
-                settings = json.load(f)
-        else:
-            await interaction.response.send_message("Settings not configured. Use /setup first.", ephemeral=True)
+    @app_commands.describe(
+        gamemode="Gamemode this queue serves (e.g., Sword, Mace); leave empty for all gamemodes",
+        region="Region this queue serves (e.g., AS, EU, NA); leave empty for all regions"
+    )
+    @instrument("command", "createqueue")
+    async def createqueue(self, interaction: discord.Interaction, gamemode: str = None, region: str = None):
+        settings = await aget_settings()
+        if not settings:
+            await ack(interaction, "Settings not configured. Use /setup first.")
             return
-        allowed_role_id = settings.get("queue_role")
-        if allowed_role_id is not None:
-            allowed_role_id = int(allowed_role_id)
-        if os.path.exists(WAITLIST_PATH):
-            with open(WAITLIST_PATH, 'r') as f:
-                try:
-                    waitlist = json.load(f)
-                except Exception:
-                    waitlist = []
-        else:
-            waitlist = []
-        players = [entry["ign"] for entry in waitlist]
-        players_lines = [f"{i+1}. {players[i] if i < len(players) else ''}" for i in range(10)]
-        testers = get_testers_for_queue(interaction.channel.id)
-        testers_lines = []
-        for i in range(3):
-            if i < len(testers):
-                user_id = testers[i]
-                testers_lines.append(f"{i+1}. <@{user_id}>")
-            else:
-                testers_lines.append(f"{i+1}.")
-        embed = discord.Embed(
-            title="Testing Queue - DEFAULT",
-            description="Please use the command /join to join the DEFAULT queue\n\n**Players:**\n" + "\n".join(players_lines) + "\n\n**Testers**\n" + "\n".join(testers_lines),
-            color=discord.Color.purple()
-        )
-        embed.set_thumbnail(url="https://i.imgur.com/your-image.png")
-        embed.timestamp = datetime.now(timezone.utc)
-        view = QueueView()
-        msg = await interaction.response.send_message(embed=embed, view=view)
-        # Store the queue state
-        set_testers_for_queue(interaction.channel.id, [])
-        # Store the message ID for future updates
-        sent_msg = await interaction.original_response()
-        set_queue_message(interaction.channel.id, sent_msg.id)
+        gamemode = gamemode.strip() if gamemode and gamemode.strip() else None
+        region = region.strip().upper() if region and region.strip() else None
+        channel_key = get_queue_key(interaction.channel.id)
+        async with queue_locks.hold(channel_key):
+            # Store the queue state
+            set_testers_for_queue(interaction.channel.id, [])
+            store.set_queue_gamemode(channel_key, gamemode)
+            store.set_queue_region(channel_key, region)
+            title, description = render_queue_content(channel_key)
+        # The queue embed is the ack; binding the message happens in the background
+        await ack(interaction, embed=build_queue_embed(title, description), view=get_queue_view(), ephemeral=False)
+        pipeline.submit(_bind_created_queue(interaction, channel_key, title, description), key=channel_key)
 
-async def setup(bot):
-    await bot.add_cog(Waitlist(bot)) 
 
-# Helper for atomic write
+async def _bind_created_queue(interaction, channel_key, title, description):
+    # Store the message ID for future updates
+    sent_msg = await outbound.submit(interaction_route(interaction), interaction.original_response, priority=PRIORITY_INTERACTION)
+    async with queue_locks.hold(channel_key):
+        set_queue_message(channel_key, sent_msg.id)
+        _last_sent[channel_key] = (sent_msg.id, title, description)
+    # Joins/leaves between the ack and the binding had no message to edit; the render is skipped if nothing changed
+    await update_queue_message(interaction.client, channel_key)
+    matchmaker.poke()
 
-def atomic_write_json(path, data):
-    dir_name = os.path.dirname(path)
-    with tempfile.NamedTemporaryFile('w', dir=dir_name, delete=False) as tf:
-        json.dump(data, tf, indent=2)
-        tempname = tf.name
-    os.replace(tempname, path) 
\ No newline at end of file
+async def setup(bot):
+    await bot.add_cog(Waitlist(bot))
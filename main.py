@@ -1,33 +1,65 @@
 import discord
 from discord.ext import commands
 import os
-from commands.waitlist import QueueView
+from commands.waitlist import get_queue_view, store as queue_store
+from services.command_sync import command_sync
+from services.control import ControlServer
+from services.outbound import outbound
+from services.logs import get_logger, setup_logging
+from services.pipeline import ack_latency, pipeline
+from services.profiling import profiler
+from services.watchdog import start_watchdog
+from storage.tierlist import tierlist
+from storage.usermeta import usermeta
 from www.config_server import start_config_server
 import asyncio
+import math
 import threading
 import re
+import signal
+import sys
+import time
 from pathlib import Path
 
-try:  # Optional Streamlit integration (for Streamlit Cloud secrets and loop detection)
-    import streamlit as st  # type: ignore
-except Exception:  # pragma: no cover
-    st = None
-
-try:
-    import tomllib  # Python 3.11+
-except Exception:  # pragma: no cover
-    tomllib = None
-try:
-    import tomli  # Fallback for <3.11
-except Exception:  # pragma: no cover
-    tomli = None
-try:
-    from dotenv import load_dotenv
-except Exception:  # pragma: no cover
-    load_dotenv = None
+log = get_logger("main")
 
 # ---- Secrets loading: supports OS env, .env, secrets.toml, and env.txt ----
 SECRET_KEYS = ["APP_ID", "PUBLIC_KEY", "TOKEN"]
+# Where Streamlit looks for secrets when running outside the Streamlit runtime
+STREAMLIT_SECRETS_PATH = os.path.join('.streamlit', 'secrets.toml')
+
+
+def _streamlit():
+    # Optional integrations are imported only when they can matter; streamlit alone
+    # pulls in hundreds of modules, so a headless run never loads it
+    st = sys.modules.get('streamlit')
+    if st is None and os.path.exists(STREAMLIT_SECRETS_PATH):
+        try:
+            import streamlit as st  # type: ignore
+        except Exception:  # pragma: no cover
+            st = None
+    return st
+
+
+def _toml_loader():
+    try:
+        import tomllib  # Python 3.11+
+        return tomllib
+    except Exception:  # pragma: no cover
+        pass
+    try:
+        import tomli  # Fallback for <3.11
+        return tomli
+    except Exception:  # pragma: no cover
+        return None
+
+
+def _dotenv_loader():
+    try:
+        from dotenv import load_dotenv
+        return load_dotenv
+    except Exception:  # pragma: no cover
+        return None
 
 
 def _parse_env_file(path: str):
@@ -48,15 +80,13 @@ def _parse_env_file(path: str):
 def _load_toml(path: str):
     if not os.path.exists(path):
         return {}
+    toml = _toml_loader()
+    if toml is None:
+        # Minimal TOML not supported; return empty
+        return {}
     try:
         with open(path, 'rb') as f:
-            if tomllib is not None:
-                data = tomllib.load(f)
-            elif tomli is not None:
-                data = tomli.load(f)
-            else:
-                # Minimal TOML not supported; return empty
-                return {}
+            data = toml.load(f)
     except Exception:
         return {}
     # Support either top-level or [discord] table
@@ -90,13 +120,14 @@ def _maybe_migrate_env_to_toml(env_path: str, toml_path: str):
         content_lines.append(f'{k} = "{v_esc}"')
     toml_text = "\n".join(content_lines) + "\n"
     _atomic_write_text(toml_path, toml_text)
-    print(f"Migrated secrets from {env_path} to {toml_path}")
+    log.info("Migrated secrets from %s to %s", env_path, toml_path)
 
 
 def load_secrets():
     # 1) OS environment has highest precedence
     secrets = {k: os.environ.get(k) for k in SECRET_KEYS}
     # 2) Streamlit secrets (supports either top-level or [discord] table)
+    st = _streamlit()
     if st is not None:
         try:
             src = st.secrets
@@ -108,7 +139,8 @@ def load_secrets():
         except Exception:
             pass
     # 3) .env file (if python-dotenv installed)
-    if load_dotenv is not None and os.path.exists('.env'):
+    load_dotenv = _dotenv_loader() if os.path.exists('.env') else None
+    if load_dotenv is not None:
         load_dotenv('.env', override=False)
         for k in SECRET_KEYS:
             if not secrets.get(k):
@@ -135,16 +167,25 @@ def load_secrets():
     return secrets
 
 
-# Attempt migration from env.txt to secrets.toml if applicable
-_maybe_migrate_env_to_toml('env.txt', 'secrets.toml')
+# Resolved on first use (see resolve_secrets) so importing or reloading this module stays cheap
+APP_ID = None
+PUBLIC_KEY = None
+TOKEN = None
+_secrets = None
 
-_secrets = load_secrets()
-APP_ID = _secrets.get('APP_ID')
-PUBLIC_KEY = _secrets.get('PUBLIC_KEY')
-TOKEN = _secrets.get('TOKEN')
 
-if not TOKEN:
-    print("Discord bot TOKEN is missing. Provide it via Streamlit secrets, environment variables, .env, secrets.toml, or env.txt.")
+def resolve_secrets():
+    global _secrets, APP_ID, PUBLIC_KEY, TOKEN
+    if _secrets is None:
+        # Attempt migration from env.txt to secrets.toml if applicable
+        _maybe_migrate_env_to_toml('env.txt', 'secrets.toml')
+        _secrets = load_secrets()
+        APP_ID = _secrets.get('APP_ID')
+        PUBLIC_KEY = _secrets.get('PUBLIC_KEY')
+        TOKEN = _secrets.get('TOKEN')
+        if not TOKEN:
+            log.error("Discord bot TOKEN is missing. Provide it via Streamlit secrets, environment variables, .env, secrets.toml, or env.txt.")
+    return _secrets
 
 # Enable required privileged intents
 intents = discord.Intents.default()
@@ -155,30 +196,91 @@ bot = commands.Bot(command_prefix="/", intents=intents)
 
 @bot.event
 async def on_ready():
-    print(f"Logged in as {bot.user}")
-    bot.add_view(QueueView())
+    log.info("Logged in as %s", bot.user)
+    bot.add_view(get_queue_view())
     try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} command(s) globally.")
+        # Only hits the API when the registered commands changed since the last sync
+        await command_sync.sync(bot)
     except Exception as e:
-        print(f"Failed to sync commands: {e}")
+        log.error("Failed to sync commands: %s", e)
+
+_started_at = time.time()
 
-async def main():
+
+def bot_status():
+    return {
+        "pid": os.getpid(),
+        "user": str(bot.user) if bot.user else None,
+        "ready": bot.is_ready(),
+        "closed": bot.is_closed(),
+        "guilds": len(bot.guilds),
+        "latency_ms": round(bot.latency * 1000, 1) if math.isfinite(bot.latency) else None,
+        "uptime": round(time.time() - _started_at, 1),
+    }
+
+
+def bot_metrics():
+    return {
+        "ack_latency": ack_latency.summary(),
+        "pipeline_backlog": pipeline.backlog(),
+        "outbound": outbound.stats(),
+        "waitlist": len(queue_store.waitlist),
+        "queues": len(queue_store.queue_state),
+        "queue_version": queue_store.version,
+    }
+
+
+def _install_stop_signals():
+    # The supervisor's fallback is SIGTERM; close cleanly so cogs flush their state
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, lambda: loop.create_task(bot.close()))
+        except (NotImplementedError, RuntimeError):  # pragma: no cover - Windows / non-main thread
+            pass
+
+
+async def main(control: bool = False):
+    # Log output is written by a background thread, never on the event loop
+    setup_logging()
+    resolve_secrets()
+    # The config server's /api endpoints read the same in-memory indexes as the cogs
+    for name, index in (("tierlist", tierlist), ("usermeta", usermeta)):
+        try:
+            await index.ensure_loaded()
+        except Exception as e:
+            log.warning("Could not load %s for the config server: %s", name, e)
     # Start local configuration website
     try:
-        start_config_server()
-        print("Config server started on http://127.0.0.1:8765")
+        start_config_server(queue_store=queue_store)
+        log.info("Config server started on http://127.0.0.1:8765")
     except Exception as e:
-        print(f"Failed to start config server: {e}")
+        log.error("Failed to start config server: %s", e)
     # Abort early if token is not set (avoid discord.py type error)
     if not TOKEN:
-        print("Bot not started because TOKEN is missing.")
+        log.error("Bot not started because TOKEN is missing.")
         return
     # Load the Results cog from the commands/results.py file
     await bot.load_extension("commands.results")
     await bot.load_extension("commands.settier")
     await bot.load_extension("commands.waitlist")
-    await bot.start(TOKEN)
+    # Opt-in (ECTIERS_LOOP_WATCHDOG=1): reports whatever blocks the event loop, with its stack
+    watchdog = start_watchdog()
+    # Lets the config panel's /debug/profile endpoints profile this loop's thread
+    profiler.attach(asyncio.get_running_loop())
+    control_server = None
+    try:
+        if control:
+            # Supervised: the dashboard process talks to us over the local control channel
+            _install_stop_signals()
+            control_server = ControlServer(bot_status, bot_metrics, bot.close)
+            await control_server.start()
+        await bot.start(TOKEN)
+    finally:
+        if control_server is not None:
+            await control_server.close()
+        if watchdog is not None:
+            await watchdog.close()
 
 
 # ---- Helpers to control the bot from external processes (e.g., Streamlit) ----
@@ -193,7 +295,7 @@ def run_bot(block: bool = False):
         return
 
     if _bot_thread and _bot_thread.is_alive():
-        print("Bot is already running.")
+        log.warning("Bot is already running.")
         return
 
     def _runner():
@@ -221,17 +323,21 @@ def stop_bot():
         else:
             asyncio.run(coro)
     except Exception as e:
-        print(f"Failed to stop bot: {e}")
+        log.error("Failed to stop bot: %s", e)
 
 
 if __name__ == "__main__":
+    if '--supervised' in sys.argv[1:]:
+        # Own process, started by www/supervisor.py
+        asyncio.run(main(control=True))
+        sys.exit(0)
     # In Streamlit runtime, an event loop is already running; use background mode.
     running_loop = None
     try:
         running_loop = asyncio.get_running_loop()
     except RuntimeError:
         running_loop = None
-    if running_loop is not None or st is not None:
+    if running_loop is not None or 'streamlit' in sys.modules:
         run_bot(block=False)
     else:
         run_bot(block=True)
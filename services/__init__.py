@@ -0,0 +1 @@
+# Makes the services directory a package for imports like services.embed_updates
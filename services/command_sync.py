@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+
+import discord
+
+from services.logs import get_logger
+from storage.jsonio import load_json_async, save_json_async
+
+log = get_logger("command_sync")
+
+# Fingerprints of the last successfully synced command tree, per application and scope
+COMMAND_SYNC_PATH = "data/command_sync.json"
+# Set to a guild ID to sync there instead of globally (guild commands update instantly)
+SYNC_GUILD_ID = os.environ.get("ECTIERS_SYNC_GUILD", "").strip()
+# Set to 1 to sync even when the fingerprint matches
+FORCE_SYNC = os.environ.get("ECTIERS_FORCE_SYNC", "").strip() in ("1", "true", "yes")
+
+
+def tree_fingerprint(tree, guild=None):
+    # Hash of the payload sync() would send; stable across restarts and dict ordering
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+                     key=lambda data: (data.get("type", 1), data["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CommandSync:
+    """Syncs the app command tree only when it differs from what was last synced."""
+
+    def __init__(self, path=COMMAND_SYNC_PATH):
+        self.path = path
+        # Scopes already checked by this process; on_ready firing again on reconnect is a no-op
+        self._done = set()
+
+    async def sync(self, bot, guild_id=None, force=False):
+        guild_id = guild_id or SYNC_GUILD_ID or None
+        guild = discord.Object(id=int(guild_id)) if guild_id else None
+        scope = f"{bot.application_id}:{guild_id or 'global'}"
+        if scope in self._done and not force:
+            return None
+        if guild is not None:
+            bot.tree.copy_global_to(guild=guild)
+        fingerprint = tree_fingerprint(bot.tree, guild=guild)
+        synced = await load_json_async(self.path, {})
+        if not (force or FORCE_SYNC) and synced.get(scope) == fingerprint:
+            self._done.add(scope)
+            log.info("Command tree unchanged for %s; skipping sync", scope)
+            return None
+        commands = await bot.tree.sync(guild=guild)
+        synced[scope] = fingerprint
+        await save_json_async(self.path, synced)
+        self._done.add(scope)
+        log.info("Synced %d command(s) to %s", len(commands), scope)
+        return commands
+
+
+command_sync = CommandSync()
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+# Repeated clicks of the same button by the same user inside this window (seconds) are dropped
+DEDUPE_WINDOW = 1.5
+
+
+class KeyedLocks:
+    """One asyncio.Lock per key (e.g. queue channel), created on demand and dropped when idle."""
+
+    def __init__(self):
+        self._locks = {}
+        self._users = {}
+
+    @asynccontextmanager
+    async def hold(self, key):
+        key = str(key)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+
+    @asynccontextmanager
+    async def hold_many(self, keys):
+        # Always acquire in sorted order so two multi-key holders can't deadlock
+        keys = sorted({str(k) for k in keys})
+        if not keys:
+            yield
+            return
+        async with self.hold(keys[0]):
+            async with self.hold_many(keys[1:]):
+                yield
+
+    def locked(self, key):
+        lock = self._locks.get(str(key))
+        return lock is not None and lock.locked()
+
+
+class InteractionDeduper:
+    """Remembers recent (user, action, scope) keys so double-clicks are handled once."""
+
+    def __init__(self, window=DEDUPE_WINDOW):
+        self.window = window
+        self._seen = {}
+        self._next_prune = 0.0
+
+    def is_duplicate(self, *key):
+        now = time.monotonic()
+        if now >= self._next_prune:
+            self._seen = {k: t for k, t in self._seen.items() if now - t < self.window}
+            self._next_prune = now + self.window
+        last = self._seen.get(key)
+        if last is not None and now - last < self.window:
+            return True
+        self._seen[key] = now
+        return False
@@ -0,0 +1,86 @@
+import asyncio
+import hmac
+import json
+import os
+
+from services.logs import get_logger
+from storage.jsonio import save_json_async
+
+log = get_logger("control")
+
+# Local control channel used by the supervisor (www/supervisor.py) when the bot runs in its own process
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = int(os.environ.get("ECTIERS_CONTROL_PORT", "8766"))
+# Shared token; requests without it are refused when it is set
+CONTROL_TOKEN = os.environ.get("ECTIERS_CONTROL_TOKEN", "")
+# Live state published for dashboards, so they never have to talk to the bot to render
+STATUS_PATH = "data/bot_status.json"
+STATUS_INTERVAL = 2.0
+# Largest request line accepted on the control channel
+MAX_REQUEST_BYTES = 4096
+
+
+class ControlServer:
+    """Answers newline-delimited JSON requests: ``{"cmd": "status" | "metrics" | "stop", "token": ...}``.
+
+    Handlers only read in-memory state, so a dashboard polling this adds no I/O to the bot's loop.
+    ``status`` and ``metrics`` are callables returning dicts; ``on_stop`` is awaited for ``stop``.
+    """
+
+    def __init__(self, status, metrics, on_stop, host=CONTROL_HOST, port=CONTROL_PORT, token=CONTROL_TOKEN):
+        self.status = status
+        self.metrics = metrics
+        self.on_stop = on_stop
+        self.host = host
+        self.port = port
+        self.token = token
+        self._server = None
+        self._publisher = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_REQUEST_BYTES)
+        self._publisher = asyncio.get_running_loop().create_task(self._publish(), name="ControlStatus")
+        log.info("Control channel listening on %s:%d", self.host, self.port)
+
+    async def _handle(self, reader, writer):
+        try:
+            line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            request = json.loads(line or b"{}")
+            reply = await self._dispatch(request)
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        try:
+            writer.write(json.dumps(reply, default=str).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request):
+        if self.token and not hmac.compare_digest(str(request.get("token", "")), self.token):
+            return {"ok": False, "error": "unauthorized"}
+        cmd = request.get("cmd")
+        if cmd == "status":
+            return {"ok": True, "status": self.status()}
+        if cmd == "metrics":
+            return {"ok": True, "metrics": self.metrics()}
+        if cmd == "stop":
+            # Reply first; shutting down closes this server
+            asyncio.get_running_loop().create_task(self.on_stop(), name="ControlStop")
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+
+    async def _publish(self):
+        while True:
+            try:
+                await save_json_async(STATUS_PATH, {"status": self.status(), "metrics": self.metrics()})
+            except Exception:
+                log.exception("Failed to publish status")
+            await asyncio.sleep(STATUS_INTERVAL)
+
+    async def close(self):
+        if self._publisher is not None:
+            self._publisher.cancel()
+            await asyncio.gather(self._publisher, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
@@ -0,0 +1,72 @@
+import asyncio
+
+from services.logs import get_logger
+
+log = get_logger("embed_updates")
+
+# Window (seconds) in which repeated update requests for one channel collapse into one edit
+DEBOUNCE_DELAY = 0.75
+
+
+class EmbedUpdateScheduler:
+    """Coalesces bursts of embed refresh requests into one edit per channel.
+
+    ``request`` only marks a channel dirty. A per-channel task waits ``delay``
+    seconds, then calls ``apply(bot, channel_id)`` which renders the *current*
+    state, so requests arriving while an edit is in flight trigger exactly one
+    follow-up edit. Bound messages are kept as ``PartialMessage`` objects so an
+    edit never needs a ``fetch_message`` round-trip first.
+    """
+
+    def __init__(self, apply, delay=DEBOUNCE_DELAY):
+        self.apply = apply
+        self.delay = delay
+        self._tasks = {}
+        self._dirty = set()
+        self._messages = {}
+
+    def request(self, bot, channel_id):
+        channel_id = str(channel_id)
+        self._dirty.add(channel_id)
+        task = self._tasks.get(channel_id)
+        if task is None or task.done():
+            self._tasks[channel_id] = asyncio.get_running_loop().create_task(
+                self._run(bot, channel_id), name=f"EmbedUpdate:{channel_id}")
+
+    async def _run(self, bot, channel_id):
+        try:
+            while channel_id in self._dirty:
+                await asyncio.sleep(self.delay)
+                self._dirty.discard(channel_id)
+                try:
+                    await self.apply(bot, channel_id)
+                except Exception:
+                    log.exception("Update for channel %s failed", channel_id)
+        finally:
+            self._tasks.pop(channel_id, None)
+
+    def message(self, bot, channel_id, message_id):
+        channel_id = str(channel_id)
+        cached = self._messages.get(channel_id)
+        if cached is not None and cached.id == int(message_id):
+            return cached
+        channel = bot.get_channel(int(channel_id)) or bot.get_partial_messageable(int(channel_id))
+        cached = channel.get_partial_message(int(message_id))
+        self._messages[channel_id] = cached
+        return cached
+
+    def forget(self, channel_id):
+        self._messages.pop(str(channel_id), None)
+
+    async def drain(self):
+        # Waits for pending edits, including their debounce, instead of cancelling them
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    async def close(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._dirty.clear()
@@ -0,0 +1,81 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+from services.metrics import correlation_id, current_handler
+
+# ECTIERS_LOG_LEVEL: DEBUG / INFO / WARNING / ...; ECTIERS_LOG_FORMAT: "text" or "json"
+LOG_LEVEL = os.environ.get("ECTIERS_LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.environ.get("ECTIERS_LOG_FORMAT", "text").strip().lower()
+# Records waiting for the writer thread; beyond this they are dropped rather than blocking the loop
+LOG_QUEUE_SIZE = 10000
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s [%(correlation_id)s %(handler)s] %(message)s"
+# LogRecord attributes that aren't user-supplied ``extra`` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "correlation_id", "handler"}
+
+_listener = None
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the interaction correlation ID and handler running when they were logged."""
+
+    def filter(self, record):
+        record.correlation_id = correlation_id.get()
+        record.handler = current_handler.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+            "handler": getattr(record, "handler", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block the event loop on log output
+            pass
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None):
+    """Routes the ``ectiers`` loggers through a queue drained by a background writer thread. Idempotent."""
+    global _listener
+    root = logging.getLogger("ectiers")
+    root.setLevel(level)
+    if _listener is not None:
+        return root
+    sink = logging.StreamHandler(stream or sys.stdout)
+    sink.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    handler = _DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    # Filters run in the logging thread before the record is queued, so they see its contextvars
+    handler.addFilter(ContextFilter())
+    root.addHandler(handler)
+    root.propagate = False
+    _listener = logging.handlers.QueueListener(handler.queue, sink, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return root
+
+
+def get_logger(name):
+    return logging.getLogger(f"ectiers.{name}")
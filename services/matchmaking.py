@@ -0,0 +1,187 @@
+import asyncio
+import heapq
+from datetime import datetime, timezone
+
+from services.logs import get_logger
+from storage.waitlist_index import gamemode_key
+
+log = get_logger("matchmaking")
+
+# Seconds between background passes when nothing pokes the matchmaker
+MATCH_TICK = 5.0
+
+
+def _region_key(region):
+    return (region or "").strip().casefold()
+
+
+class Match:
+    """A player/tester pairing produced by one matchmaking pass."""
+
+    __slots__ = ("channel_id", "tester_id", "player", "gamemode", "region", "matched_at")
+
+    def __init__(self, channel_id, tester_id, player, gamemode, region):
+        self.channel_id = channel_id
+        self.tester_id = tester_id
+        self.player = player
+        self.gamemode = gamemode
+        self.region = region
+        self.matched_at = datetime.now(timezone.utc)
+
+    def __repr__(self):
+        return f"Match(channel={self.channel_id}, tester={self.tester_id}, player={self.player.get('discord_id')})"
+
+
+def plan_matches(waitlist, queue_state):
+    """Pairs waiting players with available testers; returns [(channel_key, tester_id, entry)].
+
+    Players are considered oldest-first across all gamemodes via a heap of queue
+    heads. Each player goes to the first queue channel with a free tester whose
+    gamemode matches (or is a DEFAULT queue) and whose region matches (or either
+    side has none). A tester listed in several channels is matched at most once.
+    Does not mutate anything.
+    """
+    # Free testers per channel, and channels grouped by the gamemode they serve
+    free = {}
+    channels_for = {}
+    # A tester can sit in several channels; once matched they are taken out of all of them
+    tester_channels = {}
+    for channel_key, queue in queue_state.items():
+        testers = queue.get("testers") or []
+        if not testers:
+            continue
+        free[channel_key] = list(testers)
+        channels_for.setdefault(gamemode_key(queue.get("gamemode")), []).append(channel_key)
+        for tester_id in testers:
+            tester_channels.setdefault(tester_id, []).append(channel_key)
+    if not free:
+        return []
+    default_channels = channels_for.get("", [])
+
+    heap = []
+    for key in waitlist.gamemodes():
+        if key in channels_for or default_channels:
+            waiting = waitlist.iter_waiting(key)
+            head = next(waiting, None)
+            if head is not None:
+                heap.append((head[0], key, head[1], waiting))
+    heapq.heapify(heap)
+
+    plan = []
+    while heap:
+        order, key, entry, waiting = heapq.heappop(heap)
+        candidates = [c for c in channels_for.get(key, []) if free[c]] + [c for c in default_channels if free[c]]
+        if not candidates:
+            # No tester left for this gamemode; the rest of its queue can't match this pass
+            continue
+        region = _region_key(entry.get("region"))
+        for channel_key in candidates:
+            queue_region = _region_key(queue_state[channel_key].get("region"))
+            if not region or not queue_region or region == queue_region:
+                tester_id = free[channel_key][0]
+                for other in tester_channels[tester_id]:
+                    free[other].remove(tester_id)
+                plan.append((channel_key, tester_id, entry))
+                break
+        following = next(waiting, None)
+        if following is not None:
+            heapq.heappush(heap, (following[0], key, following[1], waiting))
+        if not any(free.values()):
+            break
+    return plan
+
+
+class Matchmaker:
+    """Background matchmaking over every queue channel.
+
+    Runs a pass every ``tick`` seconds and whenever ``poke`` is called (queue
+    changes). Each pass assigns as many compatible pairs as are available, removes
+    them from the store, and dispatches a ``queue_match`` event per match
+    (listen with ``@commands.Cog.listener() async def on_queue_match(self, match)``).
+    Passes never overlap, and applying a plan holds the affected channels' locks.
+    """
+
+    def __init__(self, bot, store, on_changed=None, tick=MATCH_TICK, locks=None):
+        self.bot = bot
+        self.store = store
+        self.on_changed = on_changed
+        self.tick = tick
+        self.locks = locks
+        self._wake = None
+        self._task = None
+        self._pass_lock = asyncio.Lock()
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._wake.set()
+        self._task = asyncio.get_running_loop().create_task(self._loop(), name="Matchmaker")
+
+    def poke(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.tick)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.run_pass()
+            except Exception:
+                log.exception("Matchmaking pass failed")
+
+    async def run_pass(self):
+        async with self._pass_lock:
+            plan = plan_matches(self.store.waitlist, self.store.queue_state)
+            if not plan:
+                return []
+            # Matched testers leave every channel they sit in, so lock all of those
+            testers = {tester_id for _, tester_id, _ in plan}
+            channels = {channel_key for channel_key, queue in self.store.queue_state.items()
+                        if testers.intersection(queue.get("testers") or ())}
+            if self.locks is None:
+                matches, changed = self._apply(plan)
+            else:
+                async with self.locks.hold_many(channels):
+                    matches, changed = self._apply(plan)
+        if matches:
+            log.info("Matched %d pair(s)", len(matches))
+            if self.on_changed is not None:
+                self.on_changed(changed)
+            for match in matches:
+                self.bot.dispatch("queue_match", match)
+        return matches
+
+    def _apply(self, plan):
+        """Applies a plan; returns the matches and every channel whose queue changed."""
+        matches = []
+        changed = set()
+        for channel_key, tester_id, entry in plan:
+            # Re-check: a Leave may have landed while we waited for the channel locks
+            if self.store.waitlist.get(entry.get("discord_id")) is not entry:
+                continue
+            if not self.store.remove_tester(channel_key, tester_id):
+                continue
+            changed.add(channel_key)
+            # The tester is busy now; they rejoin any other queue themselves once free
+            for other, queue in self.store.queue_state.items():
+                if other != channel_key and tester_id in (queue.get("testers") or ()):
+                    self.store.remove_tester(other, tester_id)
+                    changed.add(other)
+            self.store.remove_player(entry.get("discord_id"))
+            queue = self.store.queue_state.get(channel_key, {})
+            matches.append(Match(channel_key, tester_id, entry, queue.get("gamemode"), queue.get("region")))
+        return matches, changed
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
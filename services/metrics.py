@@ -0,0 +1,175 @@
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) shared by all latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Handler currently running (e.g. "command:settier"); storage and REST timings are attributed to it
+current_handler = contextvars.ContextVar("current_handler", default="background")
+# ID of the interaction being handled; log records carry it so one click's lines can be grouped
+correlation_id = contextvars.ContextVar("correlation_id", default="-")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(total)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label combination."""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((values, (list(series[0]), series[1], series[2])) for values, series in self._series.items())
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+class Gauge:
+    """Value read from ``func`` at scrape time; ``func`` returns a number or {label_values: number}."""
+
+    def __init__(self, name, help, func, labels=()):
+        self.name = name
+        self.help = help
+        self.func = func
+        self.labels = tuple(labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self.func()
+        except Exception:
+            return lines
+        if isinstance(value, dict):
+            for values, v in sorted(value.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(v)}")
+        elif value is not None:
+            lines.append(f"{self.name} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._names = set()
+
+    def register(self, metric):
+        if metric.name in self._names:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._names.add(metric.name)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, func, labels=()):
+        return self.register(Gauge(name, help, func, labels))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+handler_seconds = registry.histogram(
+    "ectiers_handler_seconds", "Time spent in app command, button and modal handlers.", ("kind", "name", "outcome"))
+storage_seconds = registry.histogram(
+    "ectiers_storage_seconds", "Storage reads and writes run on the I/O pool.", ("op", "handler"))
+rest_seconds = registry.histogram(
+    "ectiers_discord_rest_seconds", "Discord REST calls, including interaction responses.", ("kind", "handler", "outcome"))
+
+
+def instrument(kind, name):
+    """Times an interaction handler into ``handler_seconds`` and tags nested storage/REST timings with it."""
+
+    def decorator(func):
+        label = f"{kind}:{name}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            interaction = next((arg for arg in args if hasattr(arg, "response") and hasattr(arg, "created_at")), None)
+            cid_token = correlation_id.set(str(interaction.id) if interaction is not None else "-")
+            token = current_handler.set(label)
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                handler_seconds.observe(time.perf_counter() - started, kind, name, outcome)
+                current_handler.reset(token)
+                correlation_id.reset(cid_token)
+
+        return wrapper
+
+    return decorator
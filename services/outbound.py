@@ -0,0 +1,274 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+import discord
+
+from services.logs import get_logger
+from services.metrics import correlation_id, current_handler, registry, rest_seconds
+
+log = get_logger("outbound")
+
+# Priority classes for outbound REST calls; lower runs first
+PRIORITY_INTERACTION = 0
+PRIORITY_POST = 1
+PRIORITY_EMBED = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTION: "interaction", PRIORITY_POST: "post", PRIORITY_EMBED: "embed"}
+
+# Requests in flight at once across all routes; each route still sends one at a time
+OUTBOUND_CONCURRENCY = 4
+# Attempts for a request that keeps getting 429s before it is failed
+MAX_ATTEMPTS = 3
+# Fallback pause (seconds) for a route when a 429 carries no retry_after
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def channel_route(channel_id):
+    return ("channel", int(channel_id))
+
+
+def interaction_route(interaction):
+    return ("webhook", interaction.application_id, interaction.token)
+
+
+class _Job:
+    __slots__ = ("route", "priority", "factory", "coalesce", "future", "enqueued_at", "attempts", "handler", "correlation_id")
+
+    def __init__(self, route, priority, factory, coalesce, future):
+        self.route = route
+        self.priority = priority
+        self.factory = factory
+        self.coalesce = coalesce
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+        self.handler = current_handler.get()
+        self.correlation_id = correlation_id.get()
+
+
+def _consume(future):
+    # Fire-and-forget callers never await the future; don't warn about unretrieved errors
+    if not future.cancelled():
+        future.exception()
+
+
+def _settle(future, done):
+    # Resolve a superseded request's future with the outcome of the request that replaced it
+    if future.done():
+        return
+    if done.cancelled():
+        future.cancel()
+    elif done.exception() is not None:
+        future.set_exception(done.exception())
+    else:
+        future.set_result(done.result())
+
+
+class OutboundScheduler:
+    """Single queue for REST calls to Discord, ordered by priority then arrival.
+
+    ``submit(route, factory, ...)`` enqueues ``factory()`` (a callable returning a
+    coroutine) and returns a future for its result. Requests on the same route run
+    one at a time and a route that hits a 429 is paused for ``retry_after``
+    while other routes keep going. A pending request with the same ``coalesce``
+    key is superseded: the newer factory replaces it and both callers get its result.
+    """
+
+    def __init__(self, concurrency=OUTBOUND_CONCURRENCY):
+        self.concurrency = concurrency
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending = {}
+        self._busy = set()
+        self._paused = {}
+        self._wakeup = None
+        self._tasks = []
+        self._in_flight = 0
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.max_wait = 0.0
+
+    def _ensure_started(self):
+        if self._stale():
+            self._discard_stale()
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker(), name=f"Outbound:{i}") for i in range(self.concurrency)]
+
+    def _stale(self):
+        # Workers left over from a previous event loop (e.g. the panel's Stop then Start) never run again
+        return bool(self._tasks) and self._tasks[0].get_loop() is not asyncio.get_running_loop()
+
+    def _discard_stale(self):
+        dropped = self.backlog()
+        if dropped:
+            log.warning("Dropped %d request(s) queued on a previous event loop", dropped)
+        self._tasks = []
+        self._heap, self._pending, self._busy, self._paused = [], {}, set(), {}
+        self._in_flight = 0
+
+    def submit(self, route, factory, priority=PRIORITY_POST, coalesce=None):
+        self._ensure_started()
+        self.submitted += 1
+        if coalesce is not None:
+            job = self._pending.get(coalesce)
+            if job is not None:
+                # Still queued; only the newest content needs to go out
+                job.factory = factory
+                if priority < job.priority:
+                    job.priority = priority
+                    self._push(job)
+                self.coalesced += 1
+                return job.future
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        job = _Job(route, priority, factory, coalesce, future)
+        if coalesce is not None:
+            self._pending[coalesce] = job
+        self._push(job)
+        return future
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+        self._wakeup.set()
+
+    def _next_job(self):
+        # Highest-priority job whose route is neither busy nor paused; returns (job, wait)
+        now = time.monotonic()
+        for route in [route for route, resume in self._paused.items() if resume <= now]:
+            del self._paused[route]
+        skipped = []
+        found = None
+        wait = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            priority, _, job = entry
+            if job.future.done() or priority != job.priority:
+                # Already finished, or re-pushed at a higher priority
+                continue
+            resume = self._paused.get(job.route, 0)
+            if job.route in self._busy or resume > now:
+                if resume > now:
+                    wait = resume - now if wait is None else min(wait, resume - now)
+                skipped.append(entry)
+                continue
+            found = job
+            break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return found, wait
+
+    async def _worker(self):
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if job.coalesce is not None and self._pending.get(job.coalesce) is job:
+                del self._pending[job.coalesce]
+            self._busy.add(job.route)
+            self._in_flight += 1
+            self.max_wait = max(self.max_wait, time.monotonic() - job.enqueued_at)
+            try:
+                await self._run(job)
+            finally:
+                self._in_flight -= 1
+                self._busy.discard(job.route)
+                self._wakeup.set()
+
+    async def _run(self, job):
+        job.attempts += 1
+        kind = PRIORITY_NAMES.get(job.priority, str(job.priority))
+        started = time.perf_counter()
+        # Log lines from inside the call belong to the interaction that queued it
+        token, cid_token = current_handler.set(job.handler), correlation_id.set(job.correlation_id)
+        try:
+            result = await job.factory()
+        except discord.HTTPException as e:
+            rest_seconds.observe(time.perf_counter() - started, kind, job.handler, str(e.status))
+            if e.status == 429 and job.attempts < MAX_ATTEMPTS:
+                retry_after = getattr(e, "retry_after", None) or DEFAULT_RETRY_AFTER
+                self.rate_limited += 1
+                self._paused[job.route] = time.monotonic() + retry_after
+                log.warning("429 on %s route, retrying in %.2fs", job.route[0], retry_after)
+                if job.coalesce is not None:
+                    newer = self._pending.get(job.coalesce)
+                    if newer is not None:
+                        # Newer content for the same target is already queued; retrying this one could overwrite it
+                        newer.future.add_done_callback(lambda done: _settle(job.future, done))
+                        self.coalesced += 1
+                        return
+                    self._pending[job.coalesce] = job
+                self._push(job)
+                return
+            self._fail(job, e)
+        except Exception as e:
+            rest_seconds.observe(time.perf_counter() - started, kind, job.handler, "error")
+            self._fail(job, e)
+        else:
+            rest_seconds.observe(time.perf_counter() - started, kind, job.handler, "ok")
+            self.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            current_handler.reset(token)
+            correlation_id.reset(cid_token)
+
+    def _fail(self, job, error):
+        self.failed += 1
+        log.warning("%s request on %s route failed: %s", PRIORITY_NAMES.get(job.priority, job.priority), job.route[0], error)
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def backlog(self):
+        return sum(1 for _, _, job in self._heap if not job.future.done())
+
+    def stats(self):
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        oldest = 0.0
+        now = time.monotonic()
+        for priority, _, job in self._heap:
+            if job.future.done() or priority != job.priority:
+                continue
+            queued[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            oldest = max(oldest, now - job.enqueued_at)
+        return {
+            "queued": queued,
+            "in_flight": self._in_flight,
+            "oldest_wait": oldest,
+            "max_wait": self.max_wait,
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "rate_limited": self.rate_limited,
+            "paused_routes": sum(1 for resume in self._paused.values() if resume > now),
+        }
+
+    async def drain(self):
+        if self._stale():
+            self._discard_stale()
+        while self._tasks and (self.backlog() or self._in_flight):
+            await asyncio.sleep(0.05)
+
+    async def close(self):
+        await self.drain()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+outbound = OutboundScheduler()
+registry.gauge("ectiers_outbound_queued", "REST calls waiting in the outbound scheduler.",
+               lambda: {(name,): n for name, n in outbound.stats()["queued"].items()}, ("priority",))
@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+
+from discord.utils import utcnow
+
+from services.logs import get_logger
+from services.metrics import correlation_id, current_handler, registry, rest_seconds
+
+log = get_logger("pipeline")
+
+# Workers draining background side effects; jobs sharing a key always run on the same worker, in order
+PIPELINE_WORKERS = 4
+# How many recent ack latencies the percentile stats are computed over
+ACK_SAMPLES = 2048
+
+
+class BackgroundPipeline:
+    """Runs interaction side effects (state mutation, persistence, REST calls) after the ack."""
+
+    def __init__(self, workers=PIPELINE_WORKERS):
+        self.workers = workers
+        self._queues = []
+        self._tasks = []
+        self._round_robin = itertools.count()
+
+    def _ensure_started(self):
+        if self._stale():
+            self._discard_stale()
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._queues = [asyncio.Queue() for _ in range(self.workers)]
+        self._tasks = [loop.create_task(self._worker(q), name=f"Pipeline:{i}") for i, q in enumerate(self._queues)]
+
+    def _stale(self):
+        # Workers left over from a previous event loop (e.g. the panel's Stop then Start) never run again
+        return bool(self._tasks) and self._tasks[0].get_loop() is not asyncio.get_running_loop()
+
+    def _discard_stale(self):
+        dropped = 0
+        for queue in self._queues:
+            while not queue.empty():
+                queue.get_nowait()[1].close()
+                dropped += 1
+        if dropped:
+            log.warning("Dropped %d job(s) queued on a previous event loop", dropped)
+        self._tasks, self._queues = [], []
+
+    def submit(self, coro, key=None, name=None):
+        self._ensure_started()
+        index = hash(key) % self.workers if key is not None else next(self._round_robin) % self.workers
+        # Keep attributing the job's storage/REST time and log lines to the interaction that queued it
+        context = (current_handler.get(), correlation_id.get())
+        self._queues[index].put_nowait((name or getattr(coro, "__qualname__", "job"), coro, context))
+
+    async def _worker(self, queue):
+        while True:
+            name, coro, (handler, cid) = await queue.get()
+            token, cid_token = current_handler.set(handler), correlation_id.set(cid)
+            try:
+                await coro
+            except Exception:
+                log.exception("Job %s failed", name)
+            finally:
+                current_handler.reset(token)
+                correlation_id.reset(cid_token)
+                queue.task_done()
+
+    def backlog(self):
+        return sum(q.qsize() for q in self._queues)
+
+    async def drain(self):
+        if self._stale():
+            self._discard_stale()
+        for queue in self._queues:
+            await queue.join()
+
+    async def close(self):
+        await self.drain()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queues = [], []
+
+
+class AckLatency:
+    """Rolling window of time from interaction creation to our acknowledgement."""
+
+    def __init__(self, samples=ACK_SAMPLES):
+        self._samples = deque(maxlen=samples)
+        self.count = 0
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p):
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+    def summary(self):
+        return {"count": self.count, "p50": self.percentile(50), "p99": self.percentile(99)}
+
+
+pipeline = BackgroundPipeline()
+ack_latency = AckLatency()
+ack_seconds = registry.histogram("ectiers_ack_seconds", "Time from interaction creation to our acknowledgement.")
+registry.gauge("ectiers_pipeline_backlog", "Side-effect jobs waiting in the background pipeline.", lambda: pipeline.backlog())
+
+
+def record_ack(interaction):
+    seconds = (utcnow() - interaction.created_at).total_seconds()
+    ack_latency.record(seconds)
+    ack_seconds.observe(seconds)
+
+
+async def ack(interaction, content=None, ephemeral=True, **kwargs):
+    """Acknowledge first: reply with ``content`` if given, otherwise defer."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        if content is None and not kwargs:
+            await interaction.response.defer(ephemeral=ephemeral)
+        else:
+            await interaction.response.send_message(content, ephemeral=ephemeral, **kwargs)
+        outcome = "ok"
+    finally:
+        rest_seconds.observe(time.perf_counter() - started, "interaction_response", current_handler.get(), outcome)
+    record_ack(interaction)
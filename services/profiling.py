@@ -0,0 +1,215 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from services.logs import get_logger
+
+log = get_logger("profiling")
+
+# Seconds between stack samples of the loop thread in sampling mode
+SAMPLE_INTERVAL = 0.005
+# A forgotten session stops itself after this many seconds
+MAX_PROFILE_SECONDS = 300
+# Seconds to wait for the loop to run enable()/disable() for cProfile
+LOOP_CALL_TIMEOUT = 5.0
+# Rows in text reports
+REPORT_LIMIT = 60
+TRACEMALLOC_FRAMES = 25
+# Allocation noise from the profiler itself and the import system
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class ProfilingError(Exception):
+    pass
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class Profiler:
+    """On-demand profiling of the bot's event loop thread, driven from another thread.
+
+    ``cprofile`` mode enables ``cProfile`` on the loop thread itself (cProfile only
+    sees the thread that enabled it) via ``call_soon_threadsafe``. ``sample`` mode
+    instead reads the loop thread's stack every ``SAMPLE_INTERVAL`` seconds from a
+    helper thread and reports collapsed stacks (flamegraph input); it costs nothing
+    on the loop itself. Separately, tracemalloc snapshots can be taken and diffed
+    against the previous one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread_id = None
+        self._mode = None
+        self._started_at = None
+        self._profile = None
+        self._sampler = None
+        self._samples = None
+        self._stop_sampling = threading.Event()
+        self._baseline = None
+
+    def attach(self, loop, thread_id=None):
+        # Called from the loop thread at startup
+        self._loop = loop
+        self._loop_thread_id = thread_id or threading.get_ident()
+
+    # ---- CPU ----
+
+    def status(self):
+        with self._lock:
+            return {
+                "attached": self._loop is not None,
+                "mode": self._mode,
+                "running_for": round(time.monotonic() - self._started_at, 1) if self._mode else None,
+                "tracemalloc": tracemalloc.is_tracing(),
+            }
+
+    def _on_loop(self, func):
+        done = threading.Event()
+
+        def run():
+            try:
+                func()
+            finally:
+                done.set()
+
+        self._loop.call_soon_threadsafe(run)
+        if not done.wait(LOOP_CALL_TIMEOUT):
+            raise ProfilingError("event loop did not respond; it may be blocked")
+
+    def start(self, mode="sample"):
+        with self._lock:
+            if self._loop is None:
+                raise ProfilingError("no event loop attached")
+            if self._mode is not None:
+                raise ProfilingError(f"a {self._mode} session is already running")
+            if mode == "cprofile":
+                profile = cProfile.Profile()
+                self._on_loop(profile.enable)
+                self._profile = profile
+            elif mode == "sample":
+                self._samples = Counter()
+                self._stop_sampling.clear()
+                self._sampler = threading.Thread(target=self._sample, name="ProfileSampler", daemon=True)
+                self._sampler.start()
+            else:
+                raise ProfilingError(f"unknown mode {mode!r}; use 'cprofile' or 'sample'")
+            self._mode = mode
+            self._started_at = time.monotonic()
+        log.info("Started %s profiling session", mode)
+
+    def _sample(self):
+        deadline = time.monotonic() + MAX_PROFILE_SECONDS
+        while not self._stop_sampling.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+            if time.monotonic() > deadline:
+                log.warning("Sampling session hit %ds limit; no longer sampling", MAX_PROFILE_SECONDS)
+                break
+
+    def stop(self, fmt="text"):
+        """Stops the session and returns ``(filename, content_type, body)``."""
+        with self._lock:
+            mode, elapsed = self._mode, time.monotonic() - (self._started_at or time.monotonic())
+            if mode is None:
+                raise ProfilingError("no profiling session is running")
+            try:
+                if mode == "cprofile":
+                    self._on_loop(self._profile.disable)
+                    return self._cprofile_report(self._profile, elapsed, fmt)
+                self._stop_sampling.set()
+                self._sampler.join(timeout=1.0)
+                return self._sample_report(self._samples, elapsed)
+            finally:
+                self._mode = None
+                self._profile = None
+                self._sampler = None
+                self._samples = None
+                log.info("Stopped %s profiling session after %.1fs", mode, elapsed)
+
+    def _cprofile_report(self, profile, elapsed, fmt):
+        if fmt == "pstats":
+            # Same format as cProfile's -o output; open with pstats or snakeviz
+            profile.create_stats()
+            return "ectiers.pstats", "application/octet-stream", marshal.dumps(profile.stats)
+        out = io.StringIO()
+        out.write(f"cProfile of the event loop thread over {elapsed:.1f}s\n\n")
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(REPORT_LIMIT)
+        return "ectiers-profile.txt", "text/plain; charset=utf-8", out.getvalue().encode("utf-8")
+
+    def _sample_report(self, samples, elapsed):
+        # Collapsed stacks: "outer;inner count" per line, heaviest first
+        lines = [f"{stack} {count}" for stack, count in samples.most_common()]
+        body = "\n".join(lines) + "\n" if lines else f"# no samples in {elapsed:.1f}s\n"
+        return "ectiers-samples.folded", "text/plain; charset=utf-8", body.encode("utf-8")
+
+    # ---- Memory ----
+
+    def tracemalloc_start(self, frames=TRACEMALLOC_FRAMES):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                log.info("tracemalloc started with %d frame(s)", frames)
+            self._baseline = None
+
+    def tracemalloc_stop(self):
+        with self._lock:
+            tracemalloc.stop()
+            self._baseline = None
+
+    def tracemalloc_snapshot(self, fmt="text", diff=False):
+        """Snapshot (or diff against the previous snapshot); returns ``(filename, content_type, body)``."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise ProfilingError("tracemalloc is not running; start it first")
+            snapshot = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+            previous, self._baseline = self._baseline, snapshot
+        if fmt == "raw":
+            # Loadable with tracemalloc.Snapshot.load for offline comparison
+            fd, path = tempfile.mkstemp(suffix=".tracemalloc")
+            os.close(fd)
+            try:
+                snapshot.dump(path)
+                with open(path, "rb") as f:
+                    return "ectiers.tracemalloc", "application/octet-stream", f.read()
+            finally:
+                os.remove(path)
+        current, peak = tracemalloc.get_traced_memory()
+        out = io.StringIO()
+        out.write(f"traced: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB\n")
+        if diff:
+            if previous is None:
+                raise ProfilingError("no earlier snapshot to diff against; take one first")
+            out.write(f"Top {REPORT_LIMIT} changes since the previous snapshot\n\n")
+            stats = snapshot.compare_to(previous, "lineno")
+        else:
+            out.write(f"Top {REPORT_LIMIT} allocation sites\n\n")
+            stats = snapshot.statistics("lineno")
+        for stat in stats[:REPORT_LIMIT]:
+            out.write(f"{stat}\n")
+        name = "ectiers-tracemalloc-diff.txt" if diff else "ectiers-tracemalloc.txt"
+        return name, "text/plain; charset=utf-8", out.getvalue().encode("utf-8")
+
+
+# Shared instance; main() attaches it to the bot's loop and the config server drives it
+profiler = Profiler()
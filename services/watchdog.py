@@ -0,0 +1,125 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+
+from services.logs import get_logger
+from services.metrics import registry
+
+log = get_logger("watchdog")
+
+# Opt-in: ECTIERS_LOOP_WATCHDOG=1 starts the monitor; ECTIERS_ASYNCIO_DEBUG=1 also turns on asyncio's debug mode
+WATCHDOG_ENABLED = os.environ.get("ECTIERS_LOOP_WATCHDOG", "").strip().lower() in ("1", "true", "yes")
+ASYNCIO_DEBUG = os.environ.get("ECTIERS_ASYNCIO_DEBUG", "").strip().lower() in ("1", "true", "yes")
+# A callback holding the loop longer than this (seconds) is reported
+LAG_THRESHOLD = float(os.environ.get("ECTIERS_LOOP_LAG_THRESHOLD", "0.1"))
+# How often the loop-side probe wakes up
+PROBE_INTERVAL = 0.25
+# Stack frames included in a stall report
+STACK_LIMIT = 25
+
+loop_lag_seconds = registry.histogram(
+    "ectiers_loop_lag_seconds", "How late the event loop ran a probe scheduled every 250ms.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+loop_stalls = registry.counter(
+    "ectiers_loop_stalls_total", "Times a single callback blocked the event loop past the threshold.", ("task",))
+
+
+def _task_label(task):
+    if task is None:
+        return "callback"
+    coro = task.get_coro()
+    return f"{task.get_name()}:{getattr(coro, '__qualname__', type(coro).__name__)}"
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and reports whatever is blocking the loop.
+
+    A probe coroutine on the loop records how late each wakeup is (the lag metric)
+    and stamps a heartbeat. A separate thread watches that heartbeat; when it goes
+    stale for longer than ``threshold`` the loop is blocked right now, so the thread
+    captures the loop thread's current stack and running task and logs them once
+    per stall. Unlike asyncio's debug mode this names the blocking code while it is
+    still blocking, and costs one wakeup per ``interval`` otherwise.
+    """
+
+    def __init__(self, threshold=LAG_THRESHOLD, interval=PROBE_INTERVAL, asyncio_debug=ASYNCIO_DEBUG):
+        self.threshold = threshold
+        self.interval = interval
+        self.asyncio_debug = asyncio_debug
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._loop = None
+        self._loop_thread_id = None
+        self._heartbeat = time.monotonic()
+        self._probe = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        if self.asyncio_debug:
+            # asyncio then also logs every callback slower than the threshold, with its source
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold
+        self._probe = self._loop.create_task(self._run_probe(), name="LoopWatchdog")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="LoopWatchdog", daemon=True)
+        self._thread.start()
+        log.info("Loop watchdog started (threshold %.0fms)", self.threshold * 1000)
+
+    async def _run_probe(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            loop_lag_seconds.observe(lag)
+
+    def _watch(self):
+        reported = None
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold:
+                continue
+            if reported == heartbeat:
+                # Same stall as last time; one report each
+                continue
+            reported = heartbeat
+            self._report(stalled)
+
+    def _report(self, stalled):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        label = _task_label(task)
+        loop_stalls.inc(label)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame is not None else "  <no frame>\n"
+        log.warning("Event loop blocked for %.0fms+ in %s\n%s", stalled * 1000, label, stack)
+
+    async def close(self):
+        self._stop.set()
+        if self._probe is not None:
+            self._probe.cancel()
+            await asyncio.gather(self._probe, return_exceptions=True)
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+def start_watchdog():
+    """Starts a watchdog on the running loop if ECTIERS_LOOP_WATCHDOG is set; returns it or None."""
+    if not WATCHDOG_ENABLED:
+        return None
+    watchdog = LoopWatchdog()
+    watchdog.start()
+    return watchdog
@@ -0,0 +1 @@
+# Makes the storage directory a package for imports like storage.queue_store
@@ -0,0 +1,173 @@
+import os
+import threading
+
+from services.logs import get_logger
+from storage.jsonio import load_json, read_json, atomic_write_json
+
+log = get_logger("storage")
+
+DATA_DIR = "data"
+TIERLIST_PATH = os.path.join(DATA_DIR, "tierlist.json")
+USERMETA_PATH = os.path.join(DATA_DIR, "usermetadata.json")
+WAITLIST_PATH = os.path.join(DATA_DIR, "currentwaitlist.json")
+QUEUE_STATE_PATH = os.path.join(DATA_DIR, "queue_state.json")
+SQLITE_PATH = os.path.join(DATA_DIR, "ectiers.db")
+
+# "json" keeps the whole-document files in data/; "sqlite" stores everything in data/ectiers.db
+STORAGE_BACKEND = os.environ.get("ECTIERS_STORAGE", "json").strip().lower()
+
+
+def empty_usermeta():
+    return {"discord_to_ign": {}, "ign_to_discord": {}}
+
+
+class StorageBackend:
+    """Persistence interface for the bot's tierlist, usermeta, waitlist and queue state.
+
+    Methods are blocking; call them through ``storage.jsonio.run_io`` from coroutines.
+    """
+
+    name = "base"
+    # True when single changes (set_tier, link_ign, queue records) touch only their own rows;
+    # False means callers holding the data in memory should write whole documents instead
+    row_level = False
+
+    # ---- Tierlist ----
+    def load_tierlist(self):
+        raise NotImplementedError
+
+    def tier_names(self, gamemode):
+        """Tier names for a gamemode, in order, or None if the gamemode does not exist."""
+        raise NotImplementedError
+
+    def set_tier(self, ign, gamemode, tier):
+        raise NotImplementedError
+
+    def save_tierlist(self, tierlist):
+        raise NotImplementedError
+
+    # ---- User metadata ----
+    def load_usermeta(self):
+        raise NotImplementedError
+
+    def discord_for_ign(self, ign):
+        raise NotImplementedError
+
+    def igns_for_discord(self, discord_id):
+        raise NotImplementedError
+
+    def link_ign(self, discord_id, ign):
+        """Map ``ign`` to ``discord_id``, unlinking it from any previous owner."""
+        raise NotImplementedError
+
+    def save_usermeta(self, usermeta):
+        raise NotImplementedError
+
+    # ---- Waitlist / queue state ----
+    def load_waitlist(self):
+        raise NotImplementedError
+
+    def load_queue_state(self):
+        raise NotImplementedError
+
+    def apply_queue_records(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonBackend(StorageBackend):
+    """The original whole-document JSON files under data/."""
+
+    name = "json"
+
+    def __init__(self, tierlist_path=TIERLIST_PATH, usermeta_path=USERMETA_PATH,
+                 waitlist_path=WAITLIST_PATH, queue_state_path=QUEUE_STATE_PATH):
+        self.tierlist_path = tierlist_path
+        self.usermeta_path = usermeta_path
+        self.waitlist_path = waitlist_path
+        self.queue_state_path = queue_state_path
+        # Read-modify-write of one document must not interleave
+        self._lock = threading.Lock()
+
+    def load_tierlist(self):
+        # Raises FileNotFoundError / ValueError like read_json
+        return read_json(self.tierlist_path)
+
+    def tier_names(self, gamemode):
+        tiers = self.load_tierlist().get(gamemode)
+        return list(tiers) if tiers is not None else None
+
+    def set_tier(self, ign, gamemode, tier):
+        with self._lock:
+            tierlist = read_json(self.tierlist_path)
+            for members in tierlist[gamemode].values():
+                if ign in members:
+                    members.remove(ign)
+            tierlist[gamemode][tier].append(ign)
+            atomic_write_json(self.tierlist_path, tierlist)
+
+    def save_tierlist(self, tierlist):
+        atomic_write_json(self.tierlist_path, tierlist)
+
+    def load_usermeta(self):
+        usermeta = load_json(self.usermeta_path, None)
+        if not isinstance(usermeta, dict):
+            return empty_usermeta()
+        usermeta.setdefault("discord_to_ign", {})
+        usermeta.setdefault("ign_to_discord", {})
+        return usermeta
+
+    def discord_for_ign(self, ign):
+        return self.load_usermeta()["ign_to_discord"].get(ign)
+
+    def igns_for_discord(self, discord_id):
+        return list(self.load_usermeta()["discord_to_ign"].get(discord_id, []))
+
+    def link_ign(self, discord_id, ign):
+        with self._lock:
+            usermeta = self.load_usermeta()
+            # Remove IGN from its previous user
+            previous = usermeta["ign_to_discord"].get(ign)
+            if previous is not None and previous != discord_id:
+                igns = usermeta["discord_to_ign"].get(previous, [])
+                if ign in igns:
+                    igns.remove(ign)
+            usermeta["ign_to_discord"][ign] = discord_id
+            igns = usermeta["discord_to_ign"].setdefault(discord_id, [])
+            if ign not in igns:
+                igns.append(ign)
+            atomic_write_json(self.usermeta_path, usermeta)
+
+    def save_usermeta(self, usermeta):
+        atomic_write_json(self.usermeta_path, usermeta)
+
+    def load_waitlist(self):
+        return load_json(self.waitlist_path, [])
+
+    def load_queue_state(self):
+        return load_json(self.queue_state_path, {})
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Process-wide backend chosen by ECTIERS_STORAGE (created on first use)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if STORAGE_BACKEND == "sqlite":
+                from storage.sqlite_backend import SqliteBackend
+                from storage.migrate import migrate_json_to_sqlite
+                fresh = not os.path.exists(SQLITE_PATH)
+                _backend = SqliteBackend(SQLITE_PATH)
+                if fresh:
+                    migrate_json_to_sqlite(_backend)
+            else:
+                if STORAGE_BACKEND != "json":
+                    log.warning("Unknown ECTIERS_STORAGE %r; using 'json'", STORAGE_BACKEND)
+                _backend = JsonBackend()
+        return _backend
@@ -0,0 +1,93 @@
+import json
+import os
+
+from services.logs import get_logger
+
+log = get_logger("journal")
+
+
+class Journal:
+    """Append-only JSONL log of queue mutations.
+
+    Records are buffered by ``append`` and written by ``commit`` in one batch with a
+    single fsync (group commit). ``replay`` stops at the first unreadable line so a
+    torn final write from a crash is ignored rather than fatal; ``repair`` then
+    truncates it so later appends don't land on the end of the fragment.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pending = []
+        self.records_since_reset = 0
+        # Byte offset where the last replay hit a torn/unreadable line, if any
+        self._torn_at = None
+
+    def append(self, record):
+        self._pending.append(json.dumps(record, separators=(',', ':')))
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def take_pending(self):
+        lines, self._pending = self._pending, []
+        return lines
+
+    def restore_pending(self, lines):
+        # Put a batch back in front of anything appended since, e.g. after a failed write
+        self._pending = lines + self._pending
+
+    def write_batch(self, lines):
+        # Blocking; call via asyncio.to_thread from the event loop
+        if not lines:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records_since_reset += len(lines)
+
+    def replay(self):
+        # Remembers where the readable prefix ends so repair() can cut off the rest
+        self._torn_at = None
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for lineno, raw in enumerate(f, 1):
+                line = raw.strip()
+                record = None
+                if line:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        log.warning("Stopping replay at unreadable line %d of %s", lineno, self.path)
+                        self._torn_at = offset
+                        return
+                if not raw.endswith(b"\n"):
+                    # Last write never completed (no fsync'd newline); treat it as torn too
+                    self._torn_at = offset
+                    return
+                offset += len(raw)
+                if record is not None:
+                    self.records_since_reset += 1
+                    yield record
+
+    def repair(self):
+        """Cuts off a torn tail found by ``replay`` so new appends start on a clean line."""
+        if self._torn_at is None:
+            return False
+        with open(self.path, 'r+b') as f:
+            f.truncate(self._torn_at)
+            f.flush()
+            os.fsync(f.fileno())
+        log.warning("Truncated torn tail of %s at byte %d", self.path, self._torn_at)
+        self._torn_at = None
+        return True
+
+    def reset(self):
+        # Blocking; only call once a snapshot covering every record is durable
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.records_since_reset = 0
@@ -0,0 +1,145 @@
+import asyncio
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.logs import get_logger
+from services.metrics import current_handler, storage_seconds
+
+log = get_logger("storage")
+
+# File I/O never runs on the event loop; it goes to this small dedicated pool
+IO_WORKERS = 4
+_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="storage-io")
+
+# Writers to the same path are serialised: asyncio locks queue coroutines without
+# tying up pool threads, thread locks cover writers outside the loop (config server).
+_async_locks = {}
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _key(path):
+    return os.path.abspath(path)
+
+
+def _thread_lock(path):
+    key = _key(path)
+    with _thread_locks_guard:
+        lock = _thread_locks.get(key)
+        if lock is None:
+            lock = _thread_locks[key] = threading.Lock()
+        return lock
+
+
+def path_lock(path):
+    key = _key(path)
+    lock = _async_locks.get(key)
+    if lock is None:
+        lock = _async_locks[key] = asyncio.Lock()
+    return lock
+
+
+def read_json(path):
+    # Raises FileNotFoundError / ValueError so callers can tell "missing" from "invalid"
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_json(path, default):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            try:
+                return json.load(f)
+            except Exception as e:
+                log.warning("Failed to load %s: %s", path, e)
+    return default
+
+
+def atomic_write_text(path, text):
+    dir_name = os.path.dirname(path) or "."
+    os.makedirs(dir_name, exist_ok=True)
+    with _thread_lock(path):
+        with tempfile.NamedTemporaryFile('w', dir=dir_name, delete=False) as tf:
+            tf.write(text)
+            tf.flush()
+            os.fsync(tf.fileno())
+            tempname = tf.name
+        os.replace(tempname, path)
+
+
+def atomic_write_json(path, data):
+    atomic_write_text(path, json.dumps(data, indent=2))
+
+
+async def run_io(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    finally:
+        # Includes time queued for a worker, which is what the caller actually waits for
+        storage_seconds.observe(time.perf_counter() - started, getattr(func, "__name__", "io"), current_handler.get())
+
+
+async def read_json_async(path):
+    return await run_io(read_json, path)
+
+
+async def load_json_async(path, default):
+    return await run_io(load_json, path, default)
+
+
+async def write_text_async(path, text):
+    async with path_lock(path):
+        await run_io(atomic_write_text, path, text)
+
+
+async def save_json_async(path, data):
+    # Serialise on the loop so the caller's objects can't change mid-dump
+    await write_text_async(path, json.dumps(data, indent=2))
+
+
+class CoalescedWriter:
+    """Write-behind for a whole document that is held in memory.
+
+    ``request`` only marks the document dirty and returns; a flush task owned by
+    the writer then runs ``save(take())`` on the I/O pool until nothing is dirty,
+    so changes made during a write fold into one follow-up write. ``take`` runs
+    on the loop and should be cheap (hand over pending changes, not a full copy);
+    ``save`` runs on a pool thread, one call at a time.
+    """
+
+    def __init__(self, take, save, name="document"):
+        self.take = take
+        self.save = save
+        self.name = name
+        self._dirty = False
+        self._task = None
+
+    def request(self):
+        self._dirty = True
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._task = loop.create_task(self._flush_loop(), name=f"CoalescedWriter.{self.name}")
+
+    async def _flush_loop(self):
+        while self._dirty:
+            self._dirty = False
+            try:
+                await run_io(self.save, self.take())
+            except Exception:
+                # Whatever take() handed over stays with save(); the next request retries
+                log.exception("Write-behind of %s failed", self.name)
+                return
+
+    async def flush(self):
+        """Wait until every change requested so far has been written."""
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            await task
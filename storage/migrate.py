@@ -0,0 +1,73 @@
+"""One-shot migration of the JSON files in data/ into the SQLite backend.
+
+Usage: python -m storage.migrate [--db data/ectiers.db] [--force]
+"""
+import argparse
+import os
+import sys
+
+from services.logs import get_logger
+from storage.backend import JsonBackend, SQLITE_PATH
+
+log = get_logger("migrate")
+
+
+def migrate_json_to_sqlite(sqlite_backend, json_backend=None):
+    json_backend = json_backend or JsonBackend()
+    counts = {"placements": 0, "ign_links": 0, "waitlist": 0, "queues": 0}
+    try:
+        tierlist = json_backend.load_tierlist()
+    except (FileNotFoundError, ValueError):
+        tierlist = {}
+    for gamemode, tiers in tierlist.items():
+        sqlite_backend.define_tiers(gamemode, list(tiers))
+        with sqlite_backend.transaction() as conn:
+            for tier, igns in tiers.items():
+                for ign in igns:
+                    conn.execute("INSERT OR REPLACE INTO placements (gamemode, ign, tier) VALUES (?, ?, ?)", (gamemode, ign, tier))
+                    counts["placements"] += 1
+    usermeta = json_backend.load_usermeta()
+    with sqlite_backend.transaction() as conn:
+        for ign, discord_id in usermeta["ign_to_discord"].items():
+            conn.execute("INSERT OR REPLACE INTO ign_links (ign, discord_id) VALUES (?, ?)", (ign, str(discord_id)))
+            counts["ign_links"] += 1
+    # Go through a journal-mode QueueStore so an un-compacted queue journal is included
+    from storage.queue_store import QueueStore
+    queue_store = QueueStore(waitlist_path=json_backend.waitlist_path, queue_state_path=json_backend.queue_state_path, mode="journal")
+    queue_store.load()
+    records = [{"op": "enqueue", "entry": entry} for entry in queue_store.waitlist.to_list()]
+    for channel, queue in queue_store.queue_state.items():
+        records.append({"op": "set_testers", "channel": channel, "testers": queue.get("testers", [])})
+        if queue.get("message_id") is not None:
+            records.append({"op": "bind_message", "channel": channel, "message_id": queue["message_id"]})
+        if queue.get("gamemode") is not None:
+            records.append({"op": "set_gamemode", "channel": channel, "gamemode": queue["gamemode"]})
+        if queue.get("region") is not None:
+            records.append({"op": "set_region", "channel": channel, "region": queue["region"]})
+        counts["queues"] += 1
+    counts["waitlist"] = sum(1 for r in records if r["op"] == "enqueue")
+    sqlite_backend.apply_queue_records(records)
+    log.info("Imported into %s: %s", sqlite_backend.path, ", ".join(f"{k}={v}" for k, v in counts.items()))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate data/*.json into the SQLite backend.")
+    parser.add_argument("--db", default=SQLITE_PATH, help="SQLite database path (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="Import even if the database already exists")
+    args = parser.parse_args(argv)
+    if os.path.exists(args.db) and not args.force:
+        print(f"{args.db} already exists; pass --force to import again (rows are upserted).")
+        return 1
+    from storage.sqlite_backend import SqliteBackend
+    backend = SqliteBackend(args.db)
+    try:
+        counts = migrate_json_to_sqlite(backend)
+    finally:
+        backend.close()
+    print(f"Imported into {args.db}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import os
+
+from services.logs import get_logger
+from storage.backend import STORAGE_BACKEND, get_backend
+from storage.journal import Journal
+from storage.jsonio import load_json, atomic_write_text, run_io, write_text_async
+from storage.waitlist_index import WaitlistIndex
+
+log = get_logger("queue_store")
+
+DATA_DIR = "data"
+WAITLIST_PATH = os.path.join(DATA_DIR, "currentwaitlist.json")
+QUEUE_STATE_PATH = os.path.join(DATA_DIR, "queue_state.json")
+JOURNAL_PATH = os.path.join(DATA_DIR, "queue_journal.jsonl")
+SNAPSHOT_PATH = os.path.join(DATA_DIR, "queue_snapshot.json")
+
+# "journal" appends one record per mutation and compacts in the background;
+# "snapshot" rewrites the whole waitlist/queue_state documents on flush;
+# "sqlite" applies each mutation to its rows in the SQLite backend (implied by ECTIERS_STORAGE=sqlite).
+PERSISTENCE_MODE = "sqlite" if STORAGE_BACKEND == "sqlite" else os.environ.get("ECTIERS_QUEUE_PERSISTENCE", "journal").strip().lower()
+
+# Upper bound (seconds) on how long a mutation lives only in memory before it is written out
+FLUSH_INTERVAL = 2.0
+# Journal mode: window (seconds) for grouping mutations into one append + fsync
+COMMIT_INTERVAL = 0.05
+# Journal mode: fold the journal into a snapshot this often, or once it has this many records
+COMPACT_INTERVAL = 300.0
+COMPACT_THRESHOLD = 5000
+
+
+class QueueStore:
+    """Authoritative in-memory copy of the waitlist and queue state.
+
+    Reads are served from memory. In ``snapshot`` mode mutations mark the affected
+    document dirty and a background task rewrites it within ``flush_interval``
+    seconds. In ``journal`` mode every mutation is one record in an append-only
+    journal, group-committed every ``commit_interval`` seconds and periodically
+    compacted into ``queue_snapshot.json`` (plus the legacy JSON documents). In
+    ``sqlite`` mode the same records are applied as row-level statements to the
+    storage backend, one transaction per batch.
+    """
+
+    def __init__(self, waitlist_path=WAITLIST_PATH, queue_state_path=QUEUE_STATE_PATH,
+                 flush_interval=FLUSH_INTERVAL,
+                 mode=PERSISTENCE_MODE, journal_path=JOURNAL_PATH, snapshot_path=SNAPSHOT_PATH,
+                 commit_interval=COMMIT_INTERVAL, compact_interval=COMPACT_INTERVAL,
+                 compact_threshold=COMPACT_THRESHOLD, backend=None):
+        if mode not in ("journal", "snapshot", "sqlite"):
+            log.warning("Unknown persistence mode %r; using 'journal'", mode)
+            mode = "journal"
+        self.mode = mode
+        self.waitlist_path = waitlist_path
+        self.queue_state_path = queue_state_path
+        self.snapshot_path = snapshot_path
+        self.flush_interval = flush_interval
+        self.commit_interval = commit_interval
+        self.compact_interval = compact_interval
+        self.compact_threshold = compact_threshold
+        self.journal = Journal(journal_path) if mode == "journal" else None
+        self.backend = backend
+        # sqlite mode: records waiting for the next batch commit
+        self._pending = []
+        self.waitlist = WaitlistIndex()
+        self.queue_state = {}
+        self.loaded = False
+        # Bumped on every mutation so renderers can cache against it
+        self.version = 0
+        self._seq = 0
+        self._dirty = set()
+        self._wake = None
+        self._io_lock = asyncio.Lock()
+        self._flush_task = None
+        self._compact_task = None
+
+    # ---- Loading ----
+
+    def load(self):
+        self._dirty.clear()
+        if self.mode == "sqlite":
+            if self.backend is None:
+                self.backend = get_backend()
+            self.waitlist = WaitlistIndex(self.backend.load_waitlist())
+            self.queue_state = self.backend.load_queue_state()
+            self.version += 1
+            self.loaded = True
+            return
+        if self.journal is None:
+            self.waitlist = WaitlistIndex(load_json(self.waitlist_path, []))
+            self.queue_state = load_json(self.queue_state_path, {})
+            self.version += 1
+            self.loaded = True
+            return
+        snapshot = load_json(self.snapshot_path, None)
+        if isinstance(snapshot, dict):
+            self.waitlist = WaitlistIndex(snapshot.get("waitlist", []))
+            self.queue_state = snapshot.get("queue_state", {})
+            self._seq = int(snapshot.get("seq", 0))
+        else:
+            # First run in journal mode: start from the legacy documents
+            self.waitlist = WaitlistIndex(load_json(self.waitlist_path, []))
+            self.queue_state = load_json(self.queue_state_path, {})
+            self._seq = 0
+        replayed = 0
+        for record in self.journal.replay():
+            seq = record.get("seq", 0)
+            if seq <= self._seq:
+                # Already folded into the snapshot
+                continue
+            self._apply(record)
+            self._seq = seq
+            replayed += 1
+        # A crash mid-append leaves a partial last line; drop it before anything is appended after it
+        self.journal.repair()
+        if replayed:
+            log.info("Replayed %d journal record(s)", replayed)
+        self.version += 1
+        self.loaded = True
+
+    def _apply(self, record):
+        op = record.get("op")
+        if op == "enqueue":
+            self.waitlist.push(record["entry"])
+        elif op == "dequeue":
+            self.waitlist.remove(record["discord_id"])
+        elif op == "tester_join":
+            testers = self.queue_state.setdefault(record["channel"], {}).setdefault("testers", [])
+            if record["user_id"] not in testers:
+                testers.append(record["user_id"])
+        elif op == "tester_leave":
+            testers = self.queue_state.get(record["channel"], {}).get("testers", [])
+            if record["user_id"] in testers:
+                testers.remove(record["user_id"])
+        elif op == "set_testers":
+            self.queue_state.setdefault(record["channel"], {})["testers"] = list(record["testers"])
+        elif op == "bind_message":
+            self.queue_state.setdefault(record["channel"], {})["message_id"] = record["message_id"]
+        elif op == "set_gamemode":
+            self.queue_state.setdefault(record["channel"], {})["gamemode"] = record["gamemode"]
+        elif op == "set_region":
+            self.queue_state.setdefault(record["channel"], {})["region"] = record["region"]
+        else:
+            log.warning("Ignoring unknown journal op %r", op)
+
+    # ---- Mutations ----
+
+    def _record(self, record, path):
+        self.version += 1
+        if self.mode == "snapshot":
+            self.mark_dirty(path)
+            return
+        self._seq += 1
+        record["seq"] = self._seq
+        if self.journal is not None:
+            self.journal.append(record)
+        else:
+            self._pending.append(record)
+        if self._wake is not None:
+            self._wake.set()
+
+    def enqueue(self, entry):
+        # Returns False when the player is already waiting (in any gamemode)
+        if not self.waitlist.push(entry):
+            return False
+        self._record({"op": "enqueue", "entry": entry}, self.waitlist_path)
+        return True
+
+    def dequeue(self, gamemode=None):
+        # Oldest player for the gamemode, or across all gamemodes when None
+        entry = self.waitlist.pop(gamemode)
+        if entry is not None:
+            self._record({"op": "dequeue", "discord_id": entry.get("discord_id")}, self.waitlist_path)
+        return entry
+
+    def remove_player(self, discord_id):
+        entry = self.waitlist.remove(discord_id)
+        if entry is not None:
+            self._record({"op": "dequeue", "discord_id": entry.get("discord_id")}, self.waitlist_path)
+        return entry
+
+    def add_tester(self, channel_key, user_id):
+        testers = self.queue_state.setdefault(channel_key, {}).setdefault("testers", [])
+        if user_id in testers:
+            return False
+        testers.append(user_id)
+        self._record({"op": "tester_join", "channel": channel_key, "user_id": user_id}, self.queue_state_path)
+        return True
+
+    def remove_tester(self, channel_key, user_id):
+        testers = self.queue_state.get(channel_key, {}).get("testers", [])
+        if user_id not in testers:
+            return False
+        testers.remove(user_id)
+        self._record({"op": "tester_leave", "channel": channel_key, "user_id": user_id}, self.queue_state_path)
+        return True
+
+    def set_testers(self, channel_key, testers):
+        self.queue_state.setdefault(channel_key, {})["testers"] = list(testers)
+        self._record({"op": "set_testers", "channel": channel_key, "testers": list(testers)}, self.queue_state_path)
+
+    def bind_message(self, channel_key, message_id):
+        self.queue_state.setdefault(channel_key, {})["message_id"] = message_id
+        self._record({"op": "bind_message", "channel": channel_key, "message_id": message_id}, self.queue_state_path)
+
+    def set_queue_gamemode(self, channel_key, gamemode):
+        self.queue_state.setdefault(channel_key, {})["gamemode"] = gamemode
+        self._record({"op": "set_gamemode", "channel": channel_key, "gamemode": gamemode}, self.queue_state_path)
+
+    def set_queue_region(self, channel_key, region):
+        self.queue_state.setdefault(channel_key, {})["region"] = region
+        self._record({"op": "set_region", "channel": channel_key, "region": region}, self.queue_state_path)
+
+    def mark_dirty(self, *paths):
+        self._dirty.update(paths)
+        if self._wake is not None:
+            self._wake.set()
+
+    def mark_waitlist_dirty(self):
+        self.mark_dirty(self.waitlist_path)
+
+    def mark_queue_state_dirty(self):
+        self.mark_dirty(self.queue_state_path)
+
+    # ---- Background persistence ----
+
+    def start(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._io_lock = asyncio.Lock()
+        if self._dirty or self._pending or (self.journal is not None and self.journal.has_pending()):
+            self._wake.set()
+        self._flush_task = loop.create_task(self._flush_loop(), name="QueueStore.flush")
+        if self.journal is not None:
+            self._compact_task = loop.create_task(self._compact_loop(), name="QueueStore.compact")
+
+    async def _flush_loop(self):
+        interval = self.flush_interval if self.mode == "snapshot" else self.commit_interval
+        while True:
+            await self._wake.wait()
+            # Batch everything that happens within the interval into one write
+            await asyncio.sleep(interval)
+            self._wake.clear()
+            try:
+                await self.flush()
+                if self.journal is not None and self.journal.records_since_reset >= self.compact_threshold:
+                    await self.compact()
+            except Exception:
+                log.exception("Background flush failed")
+
+    async def _compact_loop(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                await self.compact()
+            except Exception:
+                log.exception("Background compaction failed")
+
+    def _snapshot(self, path):
+        if path == self.waitlist_path:
+            return json.dumps(self.waitlist.to_list(), indent=2)
+        return json.dumps(self.queue_state, indent=2)
+
+    async def flush(self):
+        if self.journal is not None:
+            await self._commit_journal()
+            return
+        if self.mode == "sqlite":
+            await self._commit_backend()
+            return
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        # Serialise on the loop so the snapshot is consistent, write off the loop
+        payloads = {path: self._snapshot(path) for path in dirty}
+        try:
+            for path, text in payloads.items():
+                await write_text_async(path, text)
+        except BaseException:
+            self._dirty.update(dirty)
+            raise
+
+    async def _commit_journal(self):
+        async with self._io_lock:
+            lines = self.journal.take_pending()
+            if not lines:
+                return
+            try:
+                await run_io(self.journal.write_batch, lines)
+            except BaseException:
+                self.journal.restore_pending(lines)
+                raise
+
+    async def _commit_backend(self):
+        async with self._io_lock:
+            records, self._pending = self._pending, []
+            if not records:
+                return
+            try:
+                await run_io(self.backend.apply_queue_records, records)
+            except BaseException:
+                self._pending = records + self._pending
+                raise
+
+    async def compact(self):
+        if self.journal is None:
+            return
+        async with self._io_lock:
+            lines = self.journal.take_pending()
+            # Everything up to self._seq is in memory, so the snapshot covers it;
+            # records still buffered are skipped on replay by their seq.
+            snapshot = json.dumps({"seq": self._seq, "waitlist": self.waitlist.to_list(), "queue_state": self.queue_state})
+            legacy = {path: self._snapshot(path) for path in (self.waitlist_path, self.queue_state_path)}
+            try:
+                await run_io(self._write_compaction, snapshot, legacy)
+            except BaseException:
+                self.journal.restore_pending(lines)
+                raise
+
+    def _write_compaction(self, snapshot, legacy):
+        atomic_write_text(self.snapshot_path, snapshot)
+        for path, text in legacy.items():
+            atomic_write_text(path, text)
+        self.journal.reset()
+
+    async def close(self):
+        for task in (self._flush_task, self._compact_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = self._compact_task = None
+        if self.journal is not None:
+            await self.compact()
+        else:
+            await self.flush()
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+
+from services.logs import get_logger
+from storage.jsonio import load_json, atomic_write_json, run_io
+
+log = get_logger("settings")
+
+SETTINGS_PATH = os.path.join("data", "settings.json")
+
+# How often (seconds) readers may stat() settings.json to notice out-of-process edits
+STAT_INTERVAL = 1.0
+
+
+def _as_int(settings, key):
+    value = settings.get(key)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        log.warning("Ignoring invalid %s: %r", key, value)
+        return None
+
+
+def _as_int_set(settings, key):
+    ids = set()
+    for value in settings.get(key) or []:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            log.warning("Ignoring invalid entry in %s: %r", key, value)
+    return frozenset(ids)
+
+
+class SettingsSnapshot:
+    """Parsed, validated view of settings.json. Treat as read-only."""
+
+    __slots__ = ("raw", "version", "mtime", "results_channel", "results_roles", "queue_role", "queue_category", "staff_role")
+
+    def __init__(self, raw, version, mtime=None):
+        self.raw = raw
+        self.version = version
+        # Wall-clock modification time of settings.json (seconds), or None if it doesn't exist
+        self.mtime = mtime
+        self.results_channel = _as_int(raw, "results_channel")
+        self.results_roles = _as_int_set(raw, "results_roles")
+        self.queue_role = _as_int(raw, "queue_role")
+        self.queue_category = _as_int(raw, "queue_category")
+        self.staff_role = _as_int(raw, "staff_role")
+
+    def __bool__(self):
+        return bool(self.raw)
+
+
+class SettingsService:
+    """Process-wide settings cache shared by the cogs, the config server and the Streamlit panel.
+
+    ``get`` returns the current snapshot from memory. The file is re-parsed only when
+    its mtime changes (checked at most every ``stat_interval`` seconds) or after
+    ``invalidate``/``save`` is called by a writer in this process.
+    """
+
+    def __init__(self, path=SETTINGS_PATH, stat_interval=STAT_INTERVAL):
+        self.path = path
+        self.stat_interval = stat_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._mtime = None
+        self._next_stat = 0.0
+        self._version = 0
+
+    def _mtime_now(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _reload(self, mtime):
+        self._version += 1
+        self._snapshot = SettingsSnapshot(load_json(self.path, {}), self._version,
+                                          mtime / 1e9 if mtime is not None else None)
+        self._mtime = mtime
+
+    def get(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now < self._next_stat:
+            return snapshot
+        with self._lock:
+            self._next_stat = now + self.stat_interval
+            mtime = self._mtime_now()
+            if self._snapshot is None or mtime != self._mtime:
+                self._reload(mtime)
+            return self._snapshot
+
+    async def aget(self):
+        # Same as get(), but any stat/parse it needs happens on the storage I/O pool
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_stat:
+            return snapshot
+        return await run_io(self.get)
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def save(self, data):
+        with self._lock:
+            atomic_write_json(self.path, data)
+            self._reload(self._mtime_now())
+            return self._snapshot
+
+    async def asave(self, data):
+        return await run_io(self.save, dict(data))
+
+
+# Shared instance; import this rather than reading settings.json directly
+settings = SettingsService()
+
+
+def get_settings():
+    return settings.get()
+
+
+async def aget_settings():
+    return await settings.aget()
@@ -0,0 +1,231 @@
+import json
+import os
+import sqlite3
+import threading
+
+from services.logs import get_logger
+from storage.backend import StorageBackend
+
+log = get_logger("sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tiers (
+    gamemode TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (gamemode, tier)
+);
+CREATE TABLE IF NOT EXISTS placements (
+    gamemode TEXT NOT NULL,
+    ign TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    PRIMARY KEY (gamemode, ign)
+);
+CREATE INDEX IF NOT EXISTS idx_placements_ign ON placements (ign);
+CREATE INDEX IF NOT EXISTS idx_placements_tier ON placements (gamemode, tier);
+CREATE TABLE IF NOT EXISTS ign_links (
+    ign TEXT PRIMARY KEY,
+    discord_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ign_links_discord ON ign_links (discord_id);
+CREATE TABLE IF NOT EXISTS waitlist (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    discord_id TEXT NOT NULL UNIQUE,
+    ign TEXT NOT NULL,
+    gamemode TEXT NOT NULL,
+    timestamp TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_waitlist_gamemode ON waitlist (gamemode, seq);
+CREATE INDEX IF NOT EXISTS idx_waitlist_ign ON waitlist (ign);
+CREATE TABLE IF NOT EXISTS queues (
+    channel TEXT PRIMARY KEY,
+    message_id INTEGER,
+    gamemode TEXT,
+    region TEXT
+);
+CREATE TABLE IF NOT EXISTS queue_testers (
+    channel TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (channel, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_queue_testers_order ON queue_testers (channel, position);
+"""
+
+_WAITLIST_COLUMNS = ("discord_id", "ign", "gamemode", "timestamp")
+
+
+class SqliteBackend(StorageBackend):
+    """SQLite (WAL) storage; every tier change or queue operation touches only its own rows."""
+
+    name = "sqlite"
+    row_level = True
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # One connection shared by the storage I/O pool, serialised by a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(queues)")}
+            if "region" not in columns:
+                # Databases created before queues had a region
+                self._conn.execute("ALTER TABLE queues ADD COLUMN region TEXT")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def transaction(self):
+        return _Transaction(self)
+
+    # ---- Tierlist ----
+
+    def load_tierlist(self):
+        tierlist = {}
+        for gamemode, tier in self._query("SELECT gamemode, tier FROM tiers ORDER BY gamemode, position"):
+            tierlist.setdefault(gamemode, {})[tier] = []
+        for gamemode, tier, ign in self._query("SELECT gamemode, tier, ign FROM placements ORDER BY rowid"):
+            tierlist.setdefault(gamemode, {}).setdefault(tier, []).append(ign)
+        return tierlist
+
+    def tier_names(self, gamemode):
+        rows = self._query("SELECT tier FROM tiers WHERE gamemode = ? ORDER BY position", (gamemode,))
+        return [row[0] for row in rows] if rows else None
+
+    def set_tier(self, ign, gamemode, tier):
+        with self.transaction() as conn:
+            # REPLACE re-inserts the row, so a moved player lands at the end of the tier like the JSON list did
+            conn.execute("INSERT OR REPLACE INTO placements (gamemode, ign, tier) VALUES (?, ?, ?)", (gamemode, ign, tier))
+
+    def define_tiers(self, gamemode, tiers):
+        with self.transaction() as conn:
+            for position, tier in enumerate(tiers):
+                conn.execute("INSERT OR REPLACE INTO tiers (gamemode, tier, position) VALUES (?, ?, ?)", (gamemode, tier, position))
+
+    # ---- User metadata ----
+
+    def load_usermeta(self):
+        usermeta = {"discord_to_ign": {}, "ign_to_discord": {}}
+        for ign, discord_id in self._query("SELECT ign, discord_id FROM ign_links ORDER BY rowid"):
+            usermeta["ign_to_discord"][ign] = discord_id
+            usermeta["discord_to_ign"].setdefault(discord_id, []).append(ign)
+        return usermeta
+
+    def discord_for_ign(self, ign):
+        rows = self._query("SELECT discord_id FROM ign_links WHERE ign = ?", (ign,))
+        return rows[0][0] if rows else None
+
+    def igns_for_discord(self, discord_id):
+        return [row[0] for row in self._query("SELECT ign FROM ign_links WHERE discord_id = ? ORDER BY rowid", (discord_id,))]
+
+    def link_ign(self, discord_id, ign):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO ign_links (ign, discord_id) VALUES (?, ?)", (ign, discord_id))
+
+    # ---- Waitlist / queue state ----
+
+    def load_waitlist(self):
+        entries = []
+        for discord_id, ign, gamemode, timestamp, extra in self._query(
+                "SELECT discord_id, ign, gamemode, timestamp, extra FROM waitlist ORDER BY seq"):
+            entry = {"discord_id": discord_id, "ign": ign, "gamemode": gamemode, "timestamp": timestamp}
+            if extra:
+                entry.update(json.loads(extra))
+            entries.append(entry)
+        return entries
+
+    def load_queue_state(self):
+        state = {}
+        for channel, message_id, gamemode, region in self._query("SELECT channel, message_id, gamemode, region FROM queues"):
+            queue = state.setdefault(channel, {"testers": []})
+            if message_id is not None:
+                queue["message_id"] = message_id
+            if gamemode is not None:
+                queue["gamemode"] = gamemode
+            if region is not None:
+                queue["region"] = region
+        for channel, user_id in self._query("SELECT channel, user_id FROM queue_testers ORDER BY channel, position"):
+            state.setdefault(channel, {"testers": []})["testers"].append(user_id)
+        return state
+
+    def apply_queue_records(self, records):
+        # One transaction per batch; each record only touches the rows it names
+        with self.transaction() as conn:
+            for record in records:
+                self._apply_queue_record(conn, record)
+
+    def _apply_queue_record(self, conn, record):
+        op = record.get("op")
+        if op == "enqueue":
+            self._insert_waitlist_entry(conn, record["entry"])
+        elif op == "dequeue":
+            conn.execute("DELETE FROM waitlist WHERE discord_id = ?", (str(record["discord_id"]),))
+        elif op == "tester_join":
+            self._ensure_queue(conn, record["channel"])
+            conn.execute(
+                "INSERT OR IGNORE INTO queue_testers (channel, user_id, position) "
+                "SELECT ?, ?, COALESCE(MAX(position), 0) + 1 FROM queue_testers WHERE channel = ?",
+                (record["channel"], record["user_id"], record["channel"]))
+        elif op == "tester_leave":
+            conn.execute("DELETE FROM queue_testers WHERE channel = ? AND user_id = ?", (record["channel"], record["user_id"]))
+        elif op == "set_testers":
+            self._ensure_queue(conn, record["channel"])
+            conn.execute("DELETE FROM queue_testers WHERE channel = ?", (record["channel"],))
+            conn.executemany(
+                "INSERT OR IGNORE INTO queue_testers (channel, user_id, position) VALUES (?, ?, ?)",
+                [(record["channel"], user_id, position) for position, user_id in enumerate(record["testers"], 1)])
+        elif op == "bind_message":
+            self._ensure_queue(conn, record["channel"])
+            conn.execute("UPDATE queues SET message_id = ? WHERE channel = ?", (record["message_id"], record["channel"]))
+        elif op == "set_gamemode":
+            self._ensure_queue(conn, record["channel"])
+            conn.execute("UPDATE queues SET gamemode = ? WHERE channel = ?", (record["gamemode"], record["channel"]))
+        elif op == "set_region":
+            self._ensure_queue(conn, record["channel"])
+            conn.execute("UPDATE queues SET region = ? WHERE channel = ?", (record["region"], record["channel"]))
+        else:
+            log.warning("Ignoring unknown queue op %r", op)
+
+    @staticmethod
+    def _ensure_queue(conn, channel):
+        conn.execute("INSERT OR IGNORE INTO queues (channel) VALUES (?)", (channel,))
+
+    @staticmethod
+    def _insert_waitlist_entry(conn, entry):
+        extra = {k: v for k, v in entry.items() if k not in _WAITLIST_COLUMNS}
+        conn.execute(
+            "INSERT OR IGNORE INTO waitlist (discord_id, ign, gamemode, timestamp, extra) VALUES (?, ?, ?, ?, ?)",
+            (str(entry.get("discord_id")), entry.get("ign", ""), entry.get("gamemode", ""),
+             entry.get("timestamp"), json.dumps(extra) if extra else None))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __enter__(self):
+        self.backend._lock.acquire()
+        try:
+            self.backend._conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.backend._lock.release()
+            raise
+        return self.backend._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.backend._conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self.backend._lock.release()
+        return False
@@ -0,0 +1,132 @@
+from storage.backend import get_backend
+from storage.jsonio import CoalescedWriter, run_io
+
+
+class TierlistEngine:
+    """In-memory tierlist with an ``(ign, gamemode) -> tier`` index.
+
+    Tier buckets are insertion-ordered dicts used as sets, so placing, moving and
+    looking up a player are O(1) and ``to_dict`` still reproduces tierlist.json's
+    ordering. ``profile`` gives a player's tier in every gamemode from the same index.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.loaded = False
+        self.version = 0
+        self._buckets = {}   # gamemode -> tier -> {ign: None}
+        self._profiles = {}  # ign -> {gamemode: tier}
+        self._writer = None
+        # Write-behind state for whole-document backends: the document load_from()
+        # was given, moves not yet handed to the writer, and the writer's own copy
+        self._base = None
+        self._moves = []
+        self._shadow = None
+
+    def load_from(self, tierlist):
+        buckets, profiles = {}, {}
+        for gamemode, tiers in tierlist.items():
+            buckets[gamemode] = {}
+            for tier, igns in tiers.items():
+                bucket = buckets[gamemode][tier] = {}
+                for ign in igns:
+                    previous = profiles.setdefault(ign, {}).get(gamemode)
+                    if previous is not None:
+                        # Same player listed twice in one gamemode; keep the later tier
+                        del buckets[gamemode][previous][ign]
+                    bucket[ign] = None
+                    profiles[ign][gamemode] = tier
+        self._buckets, self._profiles = buckets, profiles
+        self._base, self._moves = tierlist, []
+        self.version += 1
+        self.loaded = True
+
+    async def ensure_loaded(self):
+        # Raises FileNotFoundError / ValueError from the JSON backend if the tierlist is unusable
+        if self.loaded:
+            return
+        if self.backend is None:
+            self.backend = get_backend()
+        self.load_from(await run_io(self.backend.load_tierlist))
+
+    # ---- Reads ----
+
+    def gamemodes(self):
+        return list(self._buckets)
+
+    def tier_names(self, gamemode):
+        tiers = self._buckets.get(gamemode)
+        return list(tiers) if tiers is not None else None
+
+    def has_tier(self, gamemode, tier):
+        return tier in self._buckets.get(gamemode, ())
+
+    def tier_of(self, ign, gamemode):
+        return self._profiles.get(ign, {}).get(gamemode)
+
+    def profile(self, ign):
+        return dict(self._profiles.get(ign, {}))
+
+    def members(self, gamemode, tier):
+        return list(self._buckets.get(gamemode, {}).get(tier, ()))
+
+    def player_count(self):
+        return len(self._profiles)
+
+    def to_dict(self):
+        return {gamemode: {tier: list(bucket) for tier, bucket in tiers.items()}
+                for gamemode, tiers in self._buckets.items()}
+
+    # ---- Writes ----
+
+    def _place(self, ign, gamemode, tier):
+        profile = self._profiles.setdefault(ign, {})
+        previous = profile.get(gamemode)
+        if previous is not None:
+            del self._buckets[gamemode][previous][ign]
+        self._buckets[gamemode][tier][ign] = None
+        profile[gamemode] = tier
+        self.version += 1
+        return previous
+
+    def move(self, ign, gamemode, tier):
+        """Move ``ign`` into ``tier`` of ``gamemode`` in memory; returns the previous tier.
+
+        ``persist`` writes the same move to the backend.
+        """
+        if not self.has_tier(gamemode, tier):
+            raise KeyError(f"Tier '{tier}' not found in gamemode '{gamemode}'")
+        return self._place(ign, gamemode, tier)
+
+    async def persist(self, ign, gamemode, tier):
+        if self.backend.row_level:
+            await run_io(self.backend.set_tier, ign, gamemode, tier)
+            return
+        # Whole-document backends: queue the move and let the write-behind pick it up
+        self._moves.append((ign, gamemode, tier))
+        if self._writer is None:
+            self._writer = CoalescedWriter(self._take_moves, self._save_moves, name="tierlist")
+        self._writer.request()
+
+    async def flush(self):
+        if self._writer is not None:
+            await self._writer.flush()
+
+    def _take_moves(self):
+        moves, self._moves = self._moves, []
+        return self._base, moves
+
+    def _save_moves(self, taken):
+        # Runs on the I/O pool. The writer replays moves onto its own engine, so the
+        # loop never copies a full tierlist; only this thread builds the document.
+        base, moves = taken
+        if self._shadow is None or self._shadow._base is not base:
+            self._shadow = TierlistEngine()
+            self._shadow.load_from(base)
+        for ign, gamemode, tier in moves:
+            self._shadow._place(ign, gamemode, tier)
+        self.backend.save_tierlist(self._shadow.to_dict())
+
+
+# Shared instance backing /settier and read-side lookups
+tierlist = TierlistEngine()
@@ -0,0 +1,113 @@
+from storage.backend import get_backend
+from storage.jsonio import CoalescedWriter, run_io
+
+
+class UserMetaIndex:
+    """Bidirectional IGN <-> Discord user index.
+
+    ``ign -> discord_id`` and ``discord_id -> igns`` (an insertion-ordered set) are
+    updated together, so linking or relinking an IGN is O(1) no matter how many
+    users are known. Discord IDs are kept as strings, as in usermetadata.json.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.loaded = False
+        self._ign_to_discord = {}
+        self._discord_to_igns = {}
+        self._writer = None
+        # Write-behind state, as in TierlistEngine
+        self._base = None
+        self._links = []
+        self._shadow = None
+
+    def load_from(self, usermeta):
+        ign_to_discord = {ign: str(uid) for ign, uid in usermeta.get("ign_to_discord", {}).items()}
+        discord_to_igns = {}
+        # ign_to_discord is authoritative; discord_to_ign only supplies ordering
+        for uid, igns in usermeta.get("discord_to_ign", {}).items():
+            for ign in igns:
+                if ign_to_discord.get(ign) == str(uid):
+                    discord_to_igns.setdefault(str(uid), {})[ign] = None
+        for ign, uid in ign_to_discord.items():
+            discord_to_igns.setdefault(uid, {})[ign] = None
+        self._ign_to_discord, self._discord_to_igns = ign_to_discord, discord_to_igns
+        self._base, self._links = usermeta, []
+        self.loaded = True
+
+    async def ensure_loaded(self):
+        if self.loaded:
+            return
+        if self.backend is None:
+            self.backend = get_backend()
+        self.load_from(await run_io(self.backend.load_usermeta))
+
+    # ---- Lookups ----
+
+    def discord_for_ign(self, ign):
+        return self._ign_to_discord.get(ign)
+
+    def igns_for(self, discord_id):
+        return list(self._discord_to_igns.get(str(discord_id), ()))
+
+    def resolve_member(self, guild, ign):
+        """Cached guild member for an IGN, or None. Never hits the API."""
+        discord_id = self._ign_to_discord.get(ign)
+        if discord_id is None or guild is None:
+            return None
+        return guild.get_member(int(discord_id))
+
+    def to_dict(self):
+        return {
+            "discord_to_ign": {uid: list(igns) for uid, igns in self._discord_to_igns.items()},
+            "ign_to_discord": dict(self._ign_to_discord),
+        }
+
+    # ---- Writes ----
+
+    def _link(self, discord_id, ign):
+        previous = self._ign_to_discord.get(ign)
+        if previous is not None and previous != discord_id:
+            igns = self._discord_to_igns.get(previous)
+            if igns is not None:
+                igns.pop(ign, None)
+                if not igns:
+                    del self._discord_to_igns[previous]
+        self._ign_to_discord[ign] = discord_id
+        self._discord_to_igns.setdefault(discord_id, {})[ign] = None
+        return previous
+
+    async def link(self, discord_id, ign):
+        """Map ``ign`` to ``discord_id`` (unlinking any previous owner) and persist; returns the previous owner."""
+        discord_id = str(discord_id)
+        previous = self._link(discord_id, ign)
+        if self.backend.row_level:
+            await run_io(self.backend.link_ign, discord_id, ign)
+            return previous
+        self._links.append((discord_id, ign))
+        if self._writer is None:
+            self._writer = CoalescedWriter(self._take_links, self._save_links, name="usermeta")
+        self._writer.request()
+        return previous
+
+    async def flush(self):
+        if self._writer is not None:
+            await self._writer.flush()
+
+    def _take_links(self):
+        links, self._links = self._links, []
+        return self._base, links
+
+    def _save_links(self, taken):
+        # Runs on the I/O pool against the writer's own index
+        base, links = taken
+        if self._shadow is None or self._shadow._base is not base:
+            self._shadow = UserMetaIndex()
+            self._shadow.load_from(base)
+        for discord_id, ign in links:
+            self._shadow._link(discord_id, ign)
+        self.backend.save_usermeta(self._shadow.to_dict())
+
+
+# Shared instance used by /settier and for IGN -> member resolution in other cogs
+usermeta = UserMetaIndex()
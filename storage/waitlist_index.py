@@ -0,0 +1,210 @@
+import heapq
+from collections import deque
+from itertools import count
+
+from services.logs import get_logger
+
+log = get_logger("waitlist_index")
+
+
+def gamemode_key(name):
+    return (name or "").strip().casefold()
+
+
+class _GamemodeQueue:
+    """FIFO for one gamemode with O(1) pop and lazy (tombstoned) removal.
+
+    A Fenwick tree over slot seqs (index 1 is ``base``) counts slots that are gone,
+    popped or removed, so ``position`` is O(log n) however many tombstones there
+    are. The tree is rebuilt from ``base`` = head once half of it is behind the head.
+    """
+
+    def __init__(self):
+        self.slots = deque()  # (seq, order, entry); may still hold removed slots
+        self.removed = set()  # seqs of removed slots that are still in `slots`
+        self.next_seq = 0
+        self.live = 0
+        self.base = 0
+        self.gone = [0]       # Fenwick tree over seqs base..next_seq-1
+
+    def _gone_before(self, seq):
+        # Gone slots with base <= slot seq < seq
+        tree, i, total = self.gone, seq - self.base, 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _mark_gone(self, seq):
+        tree, i = self.gone, seq - self.base + 1
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+
+    def _rebase(self):
+        # O(slots), paid for by the pops that moved the head past half the tree
+        self.base = self.slots[0][0] if self.slots else self.next_seq
+        tree = [0] * (self.next_seq - self.base + 1)
+        for seq in self.removed:
+            tree[seq - self.base + 1] += 1
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.gone = tree
+
+    def _trim(self):
+        # Tombstones can be anywhere in the queue; only those reaching the head are dropped
+        while self.slots and self.slots[0][0] in self.removed:
+            self.removed.discard(self.slots.popleft()[0])
+        head = self.slots[0][0] if self.slots else self.next_seq
+        if head > self.base and 2 * (head - self.base) >= len(self.gone):
+            self._rebase()
+
+    def push(self, order, entry):
+        seq = self.next_seq
+        self.next_seq += 1
+        self.slots.append((seq, order, entry))
+        self.live += 1
+        # New Fenwick node i covers (i - lowbit(i), i]; the new slot itself is not gone
+        i = len(self.gone)
+        self.gone.append(self._gone_before(seq) - self._gone_before(seq + 1 - (i & -i)))
+        return seq
+
+    def head(self):
+        self._trim()
+        return self.slots[0] if self.slots else None
+
+    def pop(self):
+        self._trim()
+        if not self.slots:
+            return None
+        slot = self.slots.popleft()
+        self.live -= 1
+        self._mark_gone(slot[0])
+        self._trim()
+        return slot
+
+    def remove(self, seq):
+        self.removed.add(seq)
+        self._mark_gone(seq)
+        self.live -= 1
+        self._trim()
+
+    def position(self, seq):
+        # The newest slot (the usual case, right after joining) is simply the live count
+        if seq == self.next_seq - 1:
+            return self.live
+        return seq - self.base - self._gone_before(seq) + 1
+
+    def __iter__(self):
+        removed = self.removed
+        for slot in self.slots:
+            if slot[0] not in removed:
+                yield slot
+
+
+class WaitlistIndex:
+    """Waitlist split into one queue per gamemode plus a discord_id -> entry index.
+
+    Enqueue, dequeue, duplicate detection and position lookup do not scan the
+    waitlist. Dequeuing without a gamemode takes the oldest head across all queues.
+    """
+
+    def __init__(self, entries=()):
+        self._queues = {}
+        self._by_id = {}
+        self._order = count()
+        for entry in entries:
+            if not self.push(entry):
+                log.warning("Dropping duplicate waitlist entry for %s", entry.get('discord_id'))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, discord_id):
+        return str(discord_id) in self._by_id
+
+    def get(self, discord_id):
+        found = self._by_id.get(str(discord_id))
+        return found[2] if found else None
+
+    def push(self, entry):
+        discord_id = str(entry.get("discord_id"))
+        if discord_id in self._by_id:
+            return False
+        key = gamemode_key(entry.get("gamemode"))
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _GamemodeQueue()
+        seq = queue.push(next(self._order), entry)
+        self._by_id[discord_id] = (key, seq, entry)
+        return True
+
+    def _oldest_queue(self):
+        best, best_order = None, None
+        for queue in self._queues.values():
+            head = queue.head()
+            if head is not None and (best_order is None or head[1] < best_order):
+                best, best_order = queue, head[1]
+        return best
+
+    def pop(self, gamemode=None):
+        if gamemode is None:
+            queue = self._oldest_queue()
+        else:
+            queue = self._queues.get(gamemode_key(gamemode))
+        slot = queue.pop() if queue is not None else None
+        if slot is None:
+            return None
+        entry = slot[2]
+        del self._by_id[str(entry.get("discord_id"))]
+        return entry
+
+    def remove(self, discord_id):
+        found = self._by_id.pop(str(discord_id), None)
+        if found is None:
+            return None
+        key, seq, entry = found
+        self._queues[key].remove(seq)
+        return entry
+
+    def position(self, discord_id):
+        found = self._by_id.get(str(discord_id))
+        if found is None:
+            return None
+        key, seq, _ = found
+        return self._queues[key].position(seq)
+
+    def count(self, gamemode=None):
+        if gamemode is None:
+            return len(self._by_id)
+        queue = self._queues.get(gamemode_key(gamemode))
+        return queue.live if queue is not None else 0
+
+    def gamemodes(self):
+        return [key for key, queue in self._queues.items() if queue.live]
+
+    def entries(self, gamemode=None, limit=None):
+        if gamemode is None:
+            slots = heapq.merge(*self._queues.values(), key=lambda slot: slot[1])
+        else:
+            queue = self._queues.get(gamemode_key(gamemode))
+            slots = iter(queue) if queue is not None else iter(())
+        result = []
+        for slot in slots:
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(slot[2])
+        return result
+
+    def iter_waiting(self, gamemode):
+        """Yields (order, entry) for one gamemode queue, oldest first; order is global enqueue order."""
+        queue = self._queues.get(gamemode_key(gamemode))
+        if queue is None:
+            return
+        for _, order, entry in queue:
+            yield order, entry
+
+    def to_list(self):
+        return self.entries()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the bot's modules the same way main.py does, from the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
@@ -0,0 +1,17 @@
+import json
+
+from storage.tierlist import TierlistEngine
+from www.api import ApiSnapshots
+
+
+def test_tierlist_endpoints_are_unavailable_until_loaded():
+    engine = TierlistEngine()
+    api = ApiSnapshots(engine)
+    assert api.respond("/api/tierlist", {}).status == 503
+    assert api.respond("/api/players/alice", {}).status == 503
+
+    engine.load_from({"Sword": {"HT1": ["alice"], "LT5": []}})
+    rendered = api.respond("/api/tierlist", {})
+    assert rendered.status == 200
+    assert json.loads(rendered.body)["items"] == [{"ign": "alice", "tiers": {"Sword": "HT1"}}]
+    assert api.respond("/api/players/ALICE", {}).status == 200
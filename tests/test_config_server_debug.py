@@ -0,0 +1,46 @@
+import importlib
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from services.profiling import profiler
+from www import config_server
+
+
+@pytest.fixture
+def server():
+    httpd = config_server.ConfigServer(("127.0.0.1", 0), config_server.ConfigHandler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    profiler.tracemalloc_stop()
+
+
+def _status(url, method="GET"):
+    request = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_debug_endpoints_are_off_by_default(server, monkeypatch):
+    monkeypatch.delenv("ECTIERS_PROFILING", raising=False)
+    importlib.reload(config_server)
+    assert config_server.PROFILING_ENABLED is False
+    assert _status(server + "/debug/profile") == 404
+    assert _status(server + "/debug/tracemalloc/start", "POST") == 404
+
+
+def test_tracemalloc_snapshot_needs_post(server, monkeypatch):
+    monkeypatch.setattr(config_server, "PROFILING_ENABLED", True)
+    assert _status(server + "/debug/tracemalloc/start", "POST") == 200
+    # A crawler's or browser prefetch's GET must not move the diff baseline
+    assert _status(server + "/debug/tracemalloc/snapshot") == 404
+    assert _status(server + "/debug/tracemalloc/snapshot", "POST") == 200
+    assert _status(server + "/debug/tracemalloc/diff", "POST") == 200
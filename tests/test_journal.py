@@ -0,0 +1,51 @@
+import json
+
+from storage.journal import Journal
+from storage.queue_store import QueueStore
+
+
+def _store(tmp_path):
+    return QueueStore(waitlist_path=str(tmp_path / "waitlist.json"),
+                      queue_state_path=str(tmp_path / "queue_state.json"),
+                      mode="journal", journal_path=str(tmp_path / "journal.jsonl"),
+                      snapshot_path=str(tmp_path / "snapshot.json"))
+
+
+def _enqueue(seq, discord_id):
+    entry = {"discord_id": discord_id, "ign": f"ign{discord_id}", "gamemode": "Sword"}
+    return json.dumps({"op": "enqueue", "entry": entry, "seq": seq}, separators=(',', ':'))
+
+
+def test_torn_tail_is_truncated_and_later_appends_replay(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(_enqueue(1, "1") + "\n" + _enqueue(2, "2") + "\n" + '{"op":"enq', encoding="utf-8")
+
+    store = _store(tmp_path)
+    store.load()
+    assert [e["discord_id"] for e in store.waitlist.entries()] == ["1", "2"]
+    # The fragment is gone, so the next append starts on its own line
+    assert path.read_text(encoding="utf-8").endswith("\n")
+
+    store.journal.write_batch([_enqueue(3, "3")])
+    reloaded = _store(tmp_path)
+    reloaded.load()
+    assert [e["discord_id"] for e in reloaded.waitlist.entries()] == ["1", "2", "3"]
+
+
+def test_unterminated_last_line_counts_as_torn(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(_enqueue(1, "1") + "\n" + _enqueue(2, "2"), encoding="utf-8")
+    journal = Journal(str(path))
+    assert [r["seq"] for r in journal.replay()] == [1]
+    assert journal.repair()
+    assert path.read_text(encoding="utf-8") == _enqueue(1, "1") + "\n"
+
+
+def test_clean_journal_is_left_alone(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    text = _enqueue(1, "1") + "\n\n" + _enqueue(2, "2") + "\n"
+    path.write_text(text, encoding="utf-8")
+    journal = Journal(str(path))
+    assert [r["seq"] for r in journal.replay()] == [1, 2]
+    assert not journal.repair()
+    assert path.read_text(encoding="utf-8") == text
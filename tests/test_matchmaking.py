@@ -0,0 +1,88 @@
+import asyncio
+import random
+
+from services.matchmaking import Matchmaker, plan_matches
+from storage.queue_store import QueueStore
+from storage.waitlist_index import WaitlistIndex
+
+GAMEMODES = ("Sword", "Mace", None)
+REGIONS = ("EU", "NA", None)
+
+
+def _player(n, gamemode="Sword", region=None):
+    entry = {"discord_id": str(n), "ign": f"p{n}", "gamemode": gamemode or "Sword"}
+    if region:
+        entry["region"] = region
+    return entry
+
+
+def test_tester_in_two_channels_is_matched_once():
+    waitlist = WaitlistIndex([_player(1), _player(2)])
+    queue_state = {
+        "10": {"gamemode": "Sword", "testers": [7]},
+        "11": {"gamemode": None, "testers": [7]},
+    }
+    plan = plan_matches(waitlist, queue_state)
+    assert [(channel, tester, entry["discord_id"]) for channel, tester, entry in plan] == [("10", 7, "1")]
+
+
+class _Bot:
+    def __init__(self):
+        self.dispatched = []
+
+    def dispatch(self, event, *args):
+        self.dispatched.append((event, *args))
+
+
+def test_matched_tester_leaves_every_channel(tmp_path):
+    store = QueueStore(waitlist_path=str(tmp_path / "waitlist.json"),
+                       queue_state_path=str(tmp_path / "queue_state.json"), mode="snapshot")
+    store.loaded = True
+    store.enqueue(_player(1))
+    store.enqueue(_player(2))
+    store.set_testers("10", [7])
+    store.set_testers("11", [7])
+    changed = []
+    matchmaker = Matchmaker(_Bot(), store, on_changed=changed.append)
+
+    async def two_ticks():
+        return await matchmaker.run_pass(), await matchmaker.run_pass()
+
+    first, second = asyncio.run(two_ticks())
+    assert [(m.channel_id, m.tester_id, m.player["discord_id"]) for m in first] == [("10", 7, "1")]
+    assert second == []
+    assert changed == [{"10", "11"}]
+    assert store.queue_state["11"]["testers"] == []
+    assert store.waitlist.get("2") is not None
+
+
+def test_second_tester_still_matches_after_shared_tester_is_taken():
+    waitlist = WaitlistIndex([_player(1), _player(2)])
+    queue_state = {
+        "10": {"gamemode": "Sword", "testers": [7]},
+        "11": {"gamemode": "Sword", "testers": [7, 8]},
+    }
+    plan = plan_matches(waitlist, queue_state)
+    assert sorted(tester for _, tester, _ in plan) == [7, 8]
+
+
+def test_random_plans_never_reuse_a_tester_or_player():
+    rng = random.Random(1234)
+    for _ in range(2000):
+        players = [_player(n, rng.choice(GAMEMODES), rng.choice(REGIONS)) for n in range(rng.randint(0, 12))]
+        testers = list(range(100, 100 + rng.randint(1, 5)))
+        queue_state = {
+            str(c): {"gamemode": rng.choice(GAMEMODES), "region": rng.choice(REGIONS),
+                     "testers": rng.sample(testers, rng.randint(0, len(testers)))}
+            for c in range(rng.randint(1, 5))
+        }
+        plan = plan_matches(WaitlistIndex(players), queue_state)
+        assigned = [tester for _, tester, _ in plan]
+        matched = [entry["discord_id"] for _, _, entry in plan]
+        assert len(assigned) == len(set(assigned))
+        assert len(matched) == len(set(matched))
+        for channel, tester, entry in plan:
+            queue = queue_state[channel]
+            assert tester in queue["testers"]
+            assert queue["gamemode"] is None or queue["gamemode"].casefold() == entry["gamemode"].casefold()
+            assert not entry.get("region") or not queue["region"] or entry["region"] == queue["region"]
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from services.outbound import PRIORITY_EMBED, OutboundScheduler, channel_route
+
+
+def _rate_limited(retry_after=0.01):
+    error = discord.HTTPException(SimpleNamespace(status=429, reason="Too Many Requests"), "rate limited")
+    error.retry_after = retry_after
+    return error
+
+
+def test_outbound_survives_a_new_event_loop():
+    outbound = OutboundScheduler(concurrency=2)
+
+    async def run(n):
+        async def send():
+            return n
+        result = await asyncio.wait_for(outbound.submit(channel_route(1), send), timeout=2)
+        await outbound.drain()
+        return result
+
+    assert asyncio.run(run(1)) == 1
+    assert asyncio.run(run(2)) == 2
+
+
+def test_rate_limited_edit_does_not_overwrite_newer_content():
+    outbound = OutboundScheduler(concurrency=2)
+    applied = []
+
+    async def run():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def stale_edit():
+            started.set()
+            await release.wait()
+            raise _rate_limited()
+
+        async def fresh_edit():
+            applied.append("fresh")
+            return "fresh"
+
+        key = ("queue_embed", "1")
+        stale = outbound.submit(channel_route(1), stale_edit, priority=PRIORITY_EMBED, coalesce=key)
+        await started.wait()
+        # Queued while the stale edit is in flight, so it is not coalesced into it
+        fresh = outbound.submit(channel_route(1), fresh_edit, priority=PRIORITY_EMBED, coalesce=key)
+        release.set()
+        results = await asyncio.wait_for(asyncio.gather(stale, fresh), timeout=2)
+        await outbound.close()
+        return results
+
+    assert asyncio.run(run()) == ["fresh", "fresh"]
+    assert applied == ["fresh"]
+
+
+def test_rate_limited_request_retries_and_pause_expires():
+    outbound = OutboundScheduler(concurrency=1)
+    attempts = []
+
+    async def run():
+        async def send():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise _rate_limited()
+            return "ok"
+
+        result = await asyncio.wait_for(outbound.submit(channel_route(1), send), timeout=2)
+        await outbound.close()
+        return result
+
+    assert asyncio.run(run()) == "ok"
+    assert len(attempts) == 2
+    assert outbound._paused == {}
@@ -0,0 +1,36 @@
+import asyncio
+
+from services.pipeline import BackgroundPipeline
+
+
+def test_pipeline_survives_a_new_event_loop():
+    # Streamlit's thread mode stops the bot and starts it again on a fresh loop
+    pipeline = BackgroundPipeline(workers=2)
+    ran = []
+
+    async def job(n):
+        ran.append(n)
+
+    async def run(n):
+        pipeline.submit(job(n), key="k")
+        await asyncio.wait_for(pipeline.drain(), timeout=2)
+
+    asyncio.run(run(1))
+    asyncio.run(run(2))
+    assert ran == [1, 2]
+
+
+def test_pipeline_close_then_restart():
+    pipeline = BackgroundPipeline(workers=2)
+    ran = []
+
+    async def job(n):
+        ran.append(n)
+
+    async def run(n):
+        pipeline.submit(job(n))
+        await asyncio.wait_for(pipeline.close(), timeout=2)
+
+    asyncio.run(run(1))
+    asyncio.run(run(2))
+    assert ran == [1, 2]
@@ -0,0 +1,29 @@
+import json
+import os
+
+import pytest
+
+from www.supervisor import BotSupervisor
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def test_reused_pid_is_not_adopted_or_signalled(tmp_path):
+    # A live pid that isn't `main.py --supervised`, as after a reboot or pid reuse
+    state = tmp_path / "bot_supervisor.json"
+    state.write_text(json.dumps({"pid": os.getpid(), "port": 1, "token": "x"}))
+    supervisor = BotSupervisor(state_path=str(state))
+    assert not supervisor.is_running()
+    assert supervisor.stop() is False
+    assert not state.exists()
+
+
+def test_published_status_ignores_another_process_snapshot(tmp_path, monkeypatch):
+    supervisor = BotSupervisor(state_path=str(tmp_path / "bot_supervisor.json"))
+    monkeypatch.setattr(supervisor, "is_running", lambda: True)
+    supervisor._pid = 4242
+    snapshot = {"status": {"pid": 1111, "ready": True}, "metrics": {}}
+    monkeypatch.setattr(supervisor, "snapshot", lambda: snapshot)
+    monkeypatch.setattr(supervisor, "request", lambda cmd: pytest.fail("published_status must not use IPC"))
+    assert supervisor.published_status() == {"running": True, "published": False}
+    snapshot["status"]["pid"] = 4242
+    assert supervisor.published_status() == {"pid": 4242, "ready": True, "running": True}
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import time
+
+from storage.tierlist import TierlistEngine
+
+
+class SlowBackend:
+    row_level = False
+
+    def __init__(self):
+        self.saves = []
+        self.threads = set()
+
+    def save_tierlist(self, tierlist):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.05)
+        self.saves.append(tierlist)
+
+
+def test_persist_returns_before_the_write_and_coalesces():
+    backend = SlowBackend()
+    engine = TierlistEngine(backend)
+    engine.load_from({"sword": {"HT1": ["a"], "LT5": [f"p{i}" for i in range(50)]}})
+
+    async def run():
+        started = time.perf_counter()
+        for i in range(50):
+            engine.move(f"p{i}", "sword", "HT1")
+            await engine.persist(f"p{i}", "sword", "HT1")
+        # Every persist only queued its move; none waited for a 50ms save
+        assert time.perf_counter() - started < 0.05
+        await asyncio.wait_for(engine.flush(), timeout=5)
+
+    asyncio.run(run())
+    assert 1 <= len(backend.saves) <= 2
+    assert backend.saves[-1] == engine.to_dict()
+    assert threading.get_ident() not in backend.threads
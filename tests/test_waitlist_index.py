@@ -0,0 +1,82 @@
+import random
+
+from storage.waitlist_index import WaitlistIndex, gamemode_key
+
+GAMEMODES = ("Sword", "sword ", "Mace", "Crystal")
+
+
+class _Model:
+    """Plain list with the behaviour WaitlistIndex promises, checked op by op."""
+
+    def __init__(self):
+        self.entries = []
+
+    def push(self, entry):
+        if any(e["discord_id"] == entry["discord_id"] for e in self.entries):
+            return False
+        self.entries.append(entry)
+        return True
+
+    def pop(self, gamemode=None):
+        for i, entry in enumerate(self.entries):
+            if gamemode is None or gamemode_key(entry["gamemode"]) == gamemode_key(gamemode):
+                return self.entries.pop(i)
+        return None
+
+    def remove(self, discord_id):
+        for i, entry in enumerate(self.entries):
+            if entry["discord_id"] == discord_id:
+                return self.entries.pop(i)
+        return None
+
+    def queue(self, gamemode):
+        return [e for e in self.entries if gamemode_key(e["gamemode"]) == gamemode_key(gamemode)]
+
+    def position(self, discord_id):
+        for entry in self.entries:
+            if entry["discord_id"] == discord_id:
+                return self.queue(entry["gamemode"]).index(entry) + 1
+        return None
+
+
+def test_waitlist_index_matches_a_list_model():
+    rng = random.Random(42)
+    for _ in range(50):
+        index, model = WaitlistIndex(), _Model()
+        next_id = 0
+        for _ in range(400):
+            op = rng.random()
+            ids = [e["discord_id"] for e in model.entries]
+            if op < 0.4:
+                discord_id = str(rng.choice(ids)) if ids and rng.random() < 0.1 else str(next_id)
+                next_id += 1
+                entry = {"discord_id": discord_id, "ign": f"p{discord_id}", "gamemode": rng.choice(GAMEMODES)}
+                assert index.push(entry) == model.push(entry)
+            elif op < 0.55:
+                gamemode = rng.choice(GAMEMODES + (None,))
+                assert index.pop(gamemode) is model.pop(gamemode)
+            elif op < 0.8:
+                # Removal from the middle leaves tombstones behind
+                discord_id = rng.choice(ids) if ids and rng.random() < 0.9 else "missing"
+                assert index.remove(discord_id) is model.remove(discord_id)
+            else:
+                discord_id = rng.choice(ids) if ids else "missing"
+                assert index.position(discord_id) == model.position(discord_id)
+            assert len(index) == len(model.entries)
+            assert index.entries() == model.entries
+            for gamemode in GAMEMODES:
+                assert index.count(gamemode) == len(model.queue(gamemode))
+                assert index.entries(gamemode, limit=3) == model.queue(gamemode)[:3]
+            for entry in model.entries:
+                assert index.position(entry["discord_id"]) == model.position(entry["discord_id"])
+
+
+def test_tombstones_do_not_build_up_behind_the_head():
+    index = WaitlistIndex({"discord_id": str(n), "gamemode": "Sword"} for n in range(1000))
+    for n in range(1, 1000, 2):
+        index.remove(str(n))
+    for _ in range(500):
+        index.pop("Sword")
+    queue = index._queues["sword"]
+    assert not queue.slots and not queue.removed
+    assert queue.gone == [0]
@@ -0,0 +1,251 @@
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import unquote
+
+from storage.waitlist_index import gamemode_key
+
+# Page size bounds for the paginated endpoints
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+# Rendered pages kept per snapshot; polling clients mostly ask for the same few
+PAGE_CACHE_SIZE = 256
+# A snapshot copy can race a mutation on the bot's loop; retry that many times
+BUILD_ATTEMPTS = 5
+
+
+class Rendered:
+    """A response body with its validators; the gzip copy is made on first use."""
+
+    def __init__(self, body, content_type, modified, status=200):
+        self.body = body
+        self.content_type = content_type
+        self.status = status
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        self.modified = int(modified)
+        self.last_modified = formatdate(self.modified, usegmt=True)
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+def _json(obj, modified, status=200):
+    return Rendered(json.dumps(obj, separators=(",", ":")).encode("utf-8"), "application/json", modified, status)
+
+
+def _error(status, message):
+    return _json({"error": message}, time.time(), status)
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+class _Listing:
+    """Ordered items of one endpoint plus a key -> index map for cursor lookups."""
+
+    def __init__(self, items, key):
+        self.items = items
+        self.index = {key(item): i for i, item in enumerate(items)}
+        self.key = key
+
+
+class _Snapshot:
+    """Immutable view of one source at one version; built off the request path and shared."""
+
+    def __init__(self, version, listings, extra=None):
+        self.version = version
+        self.built_at = time.time()
+        self.listings = listings
+        self.extra = extra or {}
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+
+
+def _build(copy):
+    # Dict copies are atomic under the GIL, but walking nested state is not; retry on a race
+    for attempt in range(BUILD_ATTEMPTS):
+        try:
+            return copy()
+        except RuntimeError:
+            if attempt == BUILD_ATTEMPTS - 1:
+                raise
+            time.sleep(0.001)
+
+
+class ApiSnapshots:
+    """Read-only JSON API over the tierlist and queue store.
+
+    Each source is copied into a ``_Snapshot`` once per version, and every page
+    rendered from it (with ETag and gzip copy) is cached on that snapshot, so a
+    poll that hits an unchanged version is a couple of dict lookups. Requests
+    never read ``data/*.json``. Pagination is by opaque cursor: the key of the
+    last item returned, so pages stay consistent as items are added.
+    """
+
+    def __init__(self, tierlist, queue_store=None, usermeta=None):
+        self.tierlist = tierlist
+        self.queue_store = queue_store
+        self.usermeta = usermeta
+        self._lock = threading.Lock()
+        self._snapshots = {}
+
+    # ---- Snapshots ----
+
+    def _snapshot(self, name, version, build):
+        current = self._snapshots.get(name)
+        if current is not None and current.version == version:
+            return current
+        with self._lock:
+            current = self._snapshots.get(name)
+            if current is None or current.version != version:
+                current = _build(build)
+                current.version = version
+                self._snapshots[name] = current
+            return current
+
+    def _tierlist_snapshot(self):
+        engine = self.tierlist
+
+        def build():
+            document = engine.to_dict()
+            players = OrderedDict()
+            by_gamemode = {}
+            tiers = {}
+            for gamemode, buckets in document.items():
+                tiers[gamemode] = list(buckets)
+                rows = by_gamemode[gamemode_key(gamemode)] = []
+                for tier, igns in buckets.items():
+                    for ign in igns:
+                        rows.append({"ign": ign, "tier": tier})
+                        players.setdefault(ign, {})[gamemode] = tier
+            listings = {"players": _Listing([{"ign": ign, "tiers": t} for ign, t in players.items()], lambda item: item["ign"])}
+            for key, rows in by_gamemode.items():
+                listings["gamemode:" + key] = _Listing(rows, lambda item: item["ign"])
+            names = {gamemode_key(gamemode): gamemode for gamemode in document}
+            folded = {}
+            for ign in players:
+                folded.setdefault(ign.casefold(), ign)
+            return _Snapshot(engine.version, listings, {"tiers": tiers, "names": names, "players": players, "folded": folded})
+
+        return self._snapshot("tierlist", engine.version, build)
+
+    def _queue_snapshot(self):
+        store = self.queue_store
+
+        def build():
+            waiting = []
+            positions = {}
+            for entry in store.waitlist.entries():
+                key = gamemode_key(entry.get("gamemode"))
+                positions[key] = positions.get(key, 0) + 1
+                waiting.append(dict(entry, position=positions[key]))
+            queues = []
+            for channel, queue in sorted(dict(store.queue_state).items()):
+                queues.append({
+                    "channel": channel,
+                    "message_id": queue.get("message_id"),
+                    "gamemode": queue.get("gamemode"),
+                    "region": queue.get("region"),
+                    "testers": list(queue.get("testers", [])),
+                })
+            listings = {"waitlist": _Listing(waiting, lambda item: str(item.get("discord_id")))}
+            for key in positions:
+                listings["waitlist:" + key] = _Listing(
+                    [item for item in waiting if gamemode_key(item.get("gamemode")) == key],
+                    lambda item: str(item.get("discord_id")))
+            listings["queues"] = _Listing(queues, lambda item: item["channel"])
+            return _Snapshot(store.version, listings)
+
+        return self._snapshot("queues", store.version, build)
+
+    # ---- Rendering ----
+
+    def _page(self, snapshot, listing_name, params, envelope=None):
+        try:
+            limit = min(MAX_LIMIT, max(1, int(params.get("limit", DEFAULT_LIMIT))))
+        except ValueError:
+            return _error(400, "limit must be an integer")
+        cursor = params.get("cursor") or ""
+        cache_key = (listing_name, limit, cursor)
+        with snapshot.lock:
+            cached = snapshot.pages.get(cache_key)
+            if cached is not None:
+                snapshot.pages.move_to_end(cache_key)
+                return cached
+        listing = snapshot.listings.get(listing_name)
+        items = listing.items if listing is not None else []
+        start = 0
+        if cursor:
+            try:
+                position = listing.index.get(decode_cursor(cursor)) if listing is not None else None
+            except (ValueError, TypeError):
+                return _error(400, "invalid cursor")
+            if position is None:
+                # The item the cursor points at is gone; the client should restart from the top
+                return _error(410, "cursor is stale; restart without a cursor")
+            start = position + 1
+        page = items[start:start + limit]
+        next_cursor = encode_cursor(listing.key(page[-1])) if page and start + limit < len(items) else None
+        body = dict(envelope or {})
+        body.update({"version": snapshot.version, "total": len(items), "items": page, "next_cursor": next_cursor})
+        rendered = _json(body, snapshot.built_at)
+        with snapshot.lock:
+            snapshot.pages[cache_key] = rendered
+            while len(snapshot.pages) > PAGE_CACHE_SIZE:
+                snapshot.pages.popitem(last=False)
+        return rendered
+
+    def respond(self, path, params):
+        """Returns a ``Rendered`` for an ``/api/...`` path, or None if the path isn't ours."""
+        parts = [unquote(part) for part in path.split("/") if part][1:]
+        if not parts:
+            return None
+        head, rest = parts[0], parts[1:]
+        if head in ("tierlist", "players") and not self.tierlist.loaded:
+            # An empty 200 would read as "no players"; the bot loads the tierlist at startup
+            return _error(503, "tierlist is not loaded yet")
+        if head == "tierlist" and len(rest) <= 1:
+            snapshot = self._tierlist_snapshot()
+            if not rest:
+                return self._page(snapshot, "players", params, {"gamemodes": snapshot.extra["tiers"]})
+            key = gamemode_key(rest[0])
+            name = snapshot.extra["names"].get(key)
+            if name is None:
+                return _error(404, f"gamemode '{rest[0]}' not found")
+            return self._page(snapshot, "gamemode:" + key, params, {"gamemode": name, "tiers": snapshot.extra["tiers"][name]})
+        if head == "players" and len(rest) == 1:
+            snapshot = self._tierlist_snapshot()
+            ign = rest[0]
+            if ign not in snapshot.extra["players"]:
+                ign = snapshot.extra["folded"].get(ign.casefold())
+            if ign is None:
+                return _error(404, f"player '{rest[0]}' not found")
+            body = {"version": snapshot.version, "ign": ign, "tiers": snapshot.extra["players"][ign]}
+            if self.usermeta is not None:
+                body["discord_id"] = self.usermeta.discord_for_ign(ign)
+            return _json(body, snapshot.built_at)
+        if head in ("waitlist", "queues") and not rest:
+            if self.queue_store is None:
+                return _error(503, "queue state is not available in this process")
+            snapshot = self._queue_snapshot()
+            if head == "queues":
+                return self._page(snapshot, "queues", params)
+            gamemode = params.get("gamemode")
+            if gamemode:
+                return self._page(snapshot, "waitlist:" + gamemode_key(gamemode), params, {"gamemode": gamemode})
+            return self._page(snapshot, "waitlist", params)
+        return None
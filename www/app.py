@@ -1,4 +1,3 @@
-import json
 import os
 import re
 import streamlit as st
@@ -10,10 +9,19 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-try:
-    import main as ectiers_main
-except Exception as e:
-    ectiers_main = None
+from storage.settings import settings as settings_service
+from www.supervisor import BotSupervisor
+
+# "process" (default): the bot runs in its own process under BotSupervisor.
+# "thread": legacy mode, the bot runs on a thread inside this Streamlit process.
+BOT_MODE = os.environ.get("ECTIERS_BOT_MODE", "process").strip().lower()
+
+ectiers_main = None
+if BOT_MODE == "thread":
+    try:
+        import main as ectiers_main
+    except Exception as e:
+        ectiers_main = None
 
 def get_secret_value(name: str) -> str:
     # Mirror main.py secret resolution for display convenience
@@ -23,26 +31,10 @@ def get_secret_value(name: str) -> str:
     return val
 
 
-DATA_DIR = os.path.join(os.getcwd(), "data")
-SETTINGS_PATH = os.path.join(DATA_DIR, "settings.json")
-
-
 def load_settings():
-    if os.path.exists(SETTINGS_PATH):
-        try:
-            with open(SETTINGS_PATH, 'r') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
-
-
-def atomic_write_json(path, data):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    temp_path = path + ".tmp"
-    with open(temp_path, 'w') as tf:
-        json.dump(data, tf, indent=2)
-    os.replace(temp_path, path)
+    # Shared snapshot. In process mode (the default) the bot picks saves up from the file's mtime
+    # within a second; only the legacy thread mode shares this snapshot directly
+    return settings_service.get().raw
 
 
 def extract_id(token: str):
@@ -77,8 +69,26 @@ with st.expander("Environment info", expanded=False):
     st.write("TOKEN set:", bool(os.environ.get("TOKEN")))
 
 
+def streamlit_secret_env():
+    # Hand Streamlit secrets to the bot process; outside the Streamlit runtime it can't read them
+    env = {}
+    try:
+        src = st.secrets
+        if 'discord' in src:
+            src = src['discord']
+        for k in ("APP_ID", "PUBLIC_KEY", "TOKEN"):
+            if k in src and not os.environ.get(k):
+                env[k] = str(src.get(k))
+    except Exception:
+        pass
+    return env
+
+
 @st.cache_resource(show_spinner=False)
 def get_bot_manager():
+    if BOT_MODE != "thread":
+        return BotSupervisor()
+
     class BotManager:
         def __init__(self):
             self.started = False
@@ -120,9 +130,12 @@ if 'bot_autostarted' not in st.session_state:
         token_present = bool(os.environ.get('TOKEN'))
     if token_present:
         try:
-            if ectiers_main is not None:
-                importlib.reload(ectiers_main)
-            manager.start()
+            if BOT_MODE == "thread":
+                if ectiers_main is not None:
+                    importlib.reload(ectiers_main)
+                manager.start()
+            elif not manager.is_running():
+                manager.start(streamlit_secret_env())
             st.session_state['bot_autostarted'] = True
         except Exception as e:
             st.session_state['bot_autostarted'] = False
@@ -178,11 +191,11 @@ with st.form("settings_form"):
             if sr_id is not None:
                 next_settings["staff_role"] = sr_id
 
-        atomic_write_json(SETTINGS_PATH, next_settings)
+        settings_service.save(next_settings)
         st.success("Settings saved.")
 
 st.subheader("Current raw settings")
-st.code(json.dumps(load_settings(), indent=2), language="json")
+st.json(load_settings())
 
 st.markdown(
     "If you prefer a lightweight built-in UI instead, the bot also exposes a local panel at `http://127.0.0.1:8765` when run via `main.py`."
@@ -195,7 +208,12 @@ col1, col2, col3 = st.columns([1,1,2])
 with col1:
     if st.button("Start bot", type="primary"):
         try:
-            if ectiers_main is None:
+            if BOT_MODE != "thread":
+                if manager.start(streamlit_secret_env()):
+                    st.success("Bot process started.")
+                else:
+                    st.info("Bot is already running.")
+            elif ectiers_main is None:
                 st.error("Could not import main.py. Ensure Streamlit runs from the project root or that the project is on PYTHONPATH.")
             else:
                 importlib.reload(ectiers_main)
@@ -211,6 +229,23 @@ with col2:
         except Exception as e:
             st.error(f"Failed to stop bot: {e}")
 with col3:
-    st.caption("The bot runs in a background thread inside Streamlit. Keep this app running to keep the bot online.")
+    if BOT_MODE == "thread":
+        st.caption("The bot runs in a background thread inside Streamlit. Keep this app running to keep the bot online.")
+    else:
+        st.caption("The bot runs in its own process; it keeps running across dashboard reruns. Output goes to data/bot.log.")
+
+if BOT_MODE != "thread":
+    st.subheader("Bot status")
+    # Reruns render what the bot publishes every few seconds and never wait on it;
+    # only the button below asks the bot over the control channel
+    status = manager.published_status()
+    st.json(status)
+    if status.get("pid"):
+        st.json((manager.snapshot() or {}).get("metrics", {}), expanded=False)
+    if st.button("Ask the bot for live status"):
+        try:
+            st.json({"status": manager.status(), "metrics": manager.metrics()})
+        except Exception as e:
+            st.error(f"Failed to reach the bot: {e}")
 
 
@@ -2,30 +2,52 @@ import json
 import os
 import re
 import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from urllib.parse import parse_qs
+import time
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 
+from storage.settings import settings as settings_service
+from storage.tierlist import tierlist
+from storage.usermeta import usermeta
+from services.metrics import registry
+from services.profiling import TRACEMALLOC_FRAMES, ProfilingError, profiler
+from www.api import ApiSnapshots, Rendered
 
-DATA_DIR = os.path.join(os.getcwd(), "data")
-SETTINGS_PATH = os.path.join(DATA_DIR, "settings.json")
+# Bodies smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 512
+# Seconds a client socket may sit idle before its handler thread gives up on it
+CLIENT_TIMEOUT = 10
+# Opt-in: ECTIERS_PROFILING=1 enables the unauthenticated /debug/* profiling endpoints
+PROFILING_ENABLED = os.environ.get("ECTIERS_PROFILING", "").strip().lower() in ("1", "true", "yes")
 
 
 def _load_settings():
-    if os.path.exists(SETTINGS_PATH):
-        try:
-            with open(SETTINGS_PATH, 'r') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+    # Served from the shared in-memory snapshot, not re-read per request
+    return settings_service.get().raw
+
+
+_render_lock = threading.Lock()
+_rendered = {}
 
 
-def _atomic_write_json(path, data):
-    dir_name = os.path.dirname(path)
-    temp_path = os.path.join(dir_name, "__settings.tmp")
-    with open(temp_path, 'w') as tf:
-        json.dump(data, tf, indent=2)
-    os.replace(temp_path, path)
+def _cached(name, build, content_type):
+    # One render per settings version, shared by all handler threads
+    snapshot = settings_service.get()
+    cached = _rendered.get(name)
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1]
+    with _render_lock:
+        cached = _rendered.get(name)
+        if cached is None or cached[0] != snapshot.version:
+            modified = snapshot.mtime if snapshot.mtime is not None else time.time()
+            cached = (snapshot.version, Rendered(build(snapshot.raw), content_type, modified))
+            _rendered[name] = cached
+        return cached[1]
+
+
+def _settings_json(settings):
+    return json.dumps(settings).encode('utf-8')
 
 
 def _extract_id(token: str):
@@ -49,32 +71,8 @@ def _parse_id_list(csv_text: str):
     return ids
 
 
-class ConfigHandler(BaseHTTPRequestHandler):
-    server_version = "ECTiersConfig/1.0"
-
-    def _send_html(self, body: str, status: int = 200):
-        body_bytes = body.encode('utf-8')
-        self.send_response(status)
-        self.send_header('Content-Type', 'text/html; charset=utf-8')
-        self.send_header('Content-Length', str(len(body_bytes)))
-        self.end_headers()
-        self.wfile.write(body_bytes)
-
-    def _send_json(self, obj, status: int = 200):
-        payload = json.dumps(obj).encode('utf-8')
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Content-Length', str(len(payload)))
-        self.end_headers()
-        self.wfile.write(payload)
-
-    def do_GET(self):
-        if self.path == "/api/settings":
-            self._send_json(_load_settings())
-            return
-
-        settings = _load_settings()
-        page = f"""
+def _render_page(settings):
+    page = f"""
 <!doctype html>
 <html>
   <head>
@@ -149,7 +147,8 @@ class ConfigHandler(BaseHTTPRequestHandler):
           <strong>Current raw settings</strong>
         </div>
         <pre class=\"json\">{json.dumps(settings, indent=2)}</pre>
-        <div class=\"hint\">Endpoint: <code>/api/settings</code></div>
+        <div class=\"hint\">Endpoints: <code>/api/settings</code>, <code>/api/tierlist</code>, <code>/api/tierlist/{{gamemode}}</code>, <code>/api/players/{{ign}}</code>, <code>/api/waitlist</code>, <code>/api/queues</code>, <code>/metrics</code></div>
+        <div class=\"hint\">Profiling: <code>POST /debug/profile/start?mode=sample|cprofile</code>, <code>POST /debug/profile/stop?format=text|pstats</code>, <code>POST /debug/tracemalloc/start</code>, <code>POST /debug/tracemalloc/snapshot?format=text|raw</code>, <code>POST /debug/tracemalloc/diff</code> (set ECTIERS_PROFILING=1)</div>
       </div>
 
       <footer>ECTiers • Local configuration panel</footer>
@@ -157,9 +156,132 @@ class ConfigHandler(BaseHTTPRequestHandler):
   </body>
 </html>
 """
-        self._send_html(page)
+    return page.encode('utf-8')
+
+
+class ConfigHandler(BaseHTTPRequestHandler):
+    server_version = "ECTiersConfig/1.0"
+    timeout = CLIENT_TIMEOUT
+
+    def _not_modified(self, rendered):
+        etags = self.headers.get('If-None-Match')
+        if etags is not None:
+            # If-None-Match wins over If-Modified-Since when both are sent
+            return etags.strip() == '*' or rendered.etag in [tag.strip() for tag in etags.split(',')]
+        since = self.headers.get('If-Modified-Since')
+        if since:
+            try:
+                return rendered.modified <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_rendered(self, rendered, revalidate=True):
+        if revalidate and rendered.status == 200 and self._not_modified(rendered):
+            self.send_response(304)
+            self.send_header('ETag', rendered.etag)
+            self.send_header('Last-Modified', rendered.last_modified)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+        body = rendered.body
+        use_gzip = len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            body = rendered.gzipped()
+        self.send_response(rendered.status)
+        self.send_header('Content-Type', rendered.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', rendered.etag)
+        self.send_header('Last-Modified', rendered.last_modified)
+        # Clients may keep a copy but must revalidate; unchanged settings cost a 304
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_download(self, filename, content_type, body):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _debug(self, path, params):
+        # Profiling controls for the running bot; each action runs on this request's thread
+        if not PROFILING_ENABLED:
+            self.send_error(404)
+            return
+        post = self.command == 'POST'
+        try:
+            if path == "/debug/profile" and not post:
+                self._send_json(200, profiler.status())
+            elif path == "/debug/profile/start" and post:
+                profiler.start(params.get('mode', 'sample'))
+                self._send_json(200, profiler.status())
+            elif path == "/debug/profile/stop" and post:
+                self._send_download(*profiler.stop(params.get('format', 'text')))
+            elif path == "/debug/tracemalloc/start" and post:
+                profiler.tracemalloc_start(int(params.get('frames', TRACEMALLOC_FRAMES)))
+                self._send_json(200, profiler.status())
+            elif path == "/debug/tracemalloc/stop" and post:
+                profiler.tracemalloc_stop()
+                self._send_json(200, profiler.status())
+            elif path in ("/debug/tracemalloc/snapshot", "/debug/tracemalloc/diff") and post:
+                # POST: every snapshot becomes the baseline for the next diff
+                diff = path.endswith("/diff")
+                self._send_download(*profiler.tracemalloc_snapshot(params.get('format', 'text'), diff=diff))
+            else:
+                self.send_error(404)
+        except (ProfilingError, ValueError) as e:
+            self._send_json(409, {"error": str(e)})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        if path.startswith("/debug/"):
+            self._debug(path, {name: values[-1] for name, values in parse_qs(url.query).items()})
+            return
+        if path == "/api/settings":
+            self._send_rendered(_cached("settings", _settings_json, 'application/json'))
+            return
+        if path == "/metrics":
+            # Prometheus text exposition; scraped fresh every time
+            body = registry.render().encode('utf-8')
+            self._send_rendered(Rendered(body, 'text/plain; version=0.0.4; charset=utf-8', time.time()), revalidate=False)
+            return
+        if path.startswith("/api/"):
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            rendered = self.server.api.respond(path, params)
+            if rendered is None:
+                self.send_error(404)
+                return
+            self._send_rendered(rendered)
+            return
+        self._send_rendered(_cached("page", _render_page, 'text/html; charset=utf-8'))
+
+    do_HEAD = do_GET
 
     def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.startswith("/debug/"):
+            self._debug(url.path.rstrip('/'), {name: values[-1] for name, values in parse_qs(url.query).items()})
+            return
         if self.path != "/save":
             self.send_error(404)
             return
@@ -202,8 +324,8 @@ class ConfigHandler(BaseHTTPRequestHandler):
             if sr_id is not None:
                 next_settings['staff_role'] = sr_id
 
-        os.makedirs(DATA_DIR, exist_ok=True)
-        _atomic_write_json(SETTINGS_PATH, next_settings)
+        # Writes the file and refreshes the snapshot the cogs read from
+        settings_service.save(next_settings)
 
         # After saving, redirect back home
         self.send_response(302)
@@ -211,8 +333,15 @@ class ConfigHandler(BaseHTTPRequestHandler):
         self.end_headers()
 
 
-def start_config_server(host: str = "127.0.0.1", port: int = 8765):
-    server = HTTPServer((host, port), ConfigHandler)
+class ConfigServer(ThreadingHTTPServer):
+    # Each request gets its own thread, so a slow client can't hold up the panel
+    daemon_threads = True
+
+
+def start_config_server(host: str = "127.0.0.1", port: int = 8765, queue_store=None):
+    server = ConfigServer((host, port), ConfigHandler)
+    # Read-only /api/* endpoints; /api/waitlist and /api/queues need the bot's queue store
+    server.api = ApiSnapshots(tierlist, queue_store, usermeta)
 
     def _run():
         try:
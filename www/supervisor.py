@@ -0,0 +1,207 @@
+import json
+import os
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Only the light constants are imported here; the bot's own modules stay out of the dashboard process
+from services.control import CONTROL_HOST, CONTROL_PORT, STATUS_PATH
+from services.logs import get_logger
+
+log = get_logger("supervisor")
+
+# Remembers the running bot process so a restarted dashboard can find it again
+SUPERVISOR_PATH = os.path.join("data", "bot_supervisor.json")
+LOG_PATH = os.path.join("data", "bot.log")
+IPC_TIMEOUT = 2.0
+STOP_TIMEOUT = 15.0
+
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _is_supervised_bot(pid):
+    # True/False from /proc/<pid>/cmdline; None where there is no /proc to ask (e.g. macOS)
+    if not os.path.isdir("/proc/self"):
+        return None
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            args = f.read().split(b"\0")
+    except OSError:
+        return False
+    return b"--supervised" in args and any(os.path.basename(arg) == b"main.py" for arg in args)
+
+
+class BotSupervisor:
+    """Runs ``main.py --supervised`` in its own process and talks to it over the control channel.
+
+    Dashboard reruns only poll the child over a local socket or read the status
+    snapshot it publishes, so they never compete with the gateway loop.
+    """
+
+    def __init__(self, host=CONTROL_HOST, port=CONTROL_PORT, state_path=SUPERVISOR_PATH):
+        self.host = host
+        self.port = port
+        self.state_path = os.path.join(PROJECT_ROOT, state_path)
+        self._proc = None
+        self._pid = None
+        self._token = None
+        self._restore()
+
+    def _restore(self):
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        pid = state.get("pid")
+        if not _pid_alive(pid):
+            return
+        # After a reboot the pid may belong to an unrelated process; never adopt (or later signal) one of those
+        verdict = _is_supervised_bot(pid)
+        if verdict is False:
+            log.info("Ignoring stale bot pid %s from %s", pid, self.state_path)
+            return
+        self._pid = pid
+        self._token = state.get("token")
+        self.port = state.get("port", self.port)
+        if verdict is None:
+            # No /proc: only a process that knows our control token is ours
+            try:
+                self.request("status")
+            except (OSError, RuntimeError, ValueError):
+                log.info("Bot pid %s did not answer the control channel; not adopting it", pid)
+                self._pid = self._token = None
+
+    def _owns(self, pid):
+        return _pid_alive(pid) and _is_supervised_bot(pid) is not False
+
+    def _remember(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"pid": self._pid, "port": self.port, "token": self._token}, f)
+        os.replace(tmp, self.state_path)
+
+    def _forget(self):
+        self._proc = None
+        self._pid = None
+        self._token = None
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+
+    def is_running(self):
+        if self._proc is not None:
+            return self._proc.poll() is None
+        return self._owns(self._pid)
+
+    def start(self, extra_env=None):
+        if self.is_running():
+            return False
+        self._token = secrets.token_hex(16)
+        env = dict(os.environ, **(extra_env or {}))
+        env.update(ECTIERS_CONTROL_PORT=str(self.port), ECTIERS_CONTROL_TOKEN=self._token)
+        os.makedirs(os.path.join(PROJECT_ROOT, "data"), exist_ok=True)
+        output = open(os.path.join(PROJECT_ROOT, LOG_PATH), "ab")
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, "main.py", "--supervised"],
+                cwd=PROJECT_ROOT, env=env, stdout=output, stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL, start_new_session=True)
+        finally:
+            output.close()
+        self._pid = self._proc.pid
+        self._remember()
+        return True
+
+    def request(self, cmd, timeout=IPC_TIMEOUT):
+        payload = json.dumps({"cmd": cmd, "token": self._token or ""}).encode("utf-8") + b"\n"
+        with socket.create_connection((self.host, self.port), timeout=timeout) as conn:
+            conn.sendall(payload)
+            chunks = []
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        reply = json.loads(b"".join(chunks) or b"{}")
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "control request failed"))
+        return reply
+
+    def status(self):
+        if not self.is_running():
+            return {"running": False}
+        try:
+            return dict(self.request("status")["status"], running=True)
+        except (OSError, RuntimeError, ValueError) as e:
+            # Still starting up, or the control channel is unavailable
+            return {"running": True, "reachable": False, "error": str(e)}
+
+    def metrics(self):
+        return self.request("metrics")["metrics"]
+
+    def snapshot(self):
+        # Last state the bot published; reading it never touches the bot process
+        try:
+            with open(os.path.join(PROJECT_ROOT, STATUS_PATH), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def published_status(self):
+        # Status for dashboard reruns: the published snapshot of the running process, no IPC
+        if not self.is_running():
+            return {"running": False}
+        snapshot = self.snapshot() or {}
+        status = snapshot.get("status") or {}
+        if status.get("pid") != self._pid:
+            # Left over from an earlier process, or this one hasn't published yet
+            return {"running": True, "published": False}
+        return dict(status, running=True)
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        if not self.is_running():
+            self._forget()
+            return False
+        try:
+            self.request("stop")
+        except (OSError, RuntimeError, ValueError):
+            # Fall back to SIGTERM, which the bot also handles by closing cleanly
+            try:
+                os.kill(self._pid, signal.SIGTERM)
+            except OSError:
+                pass
+        deadline = time.monotonic() + timeout
+        while self.is_running() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if self.is_running():
+            log.warning("Bot process %s did not stop in %ss; killing it", self._pid, timeout)
+            try:
+                os.kill(self._pid, signal.SIGKILL)
+            except OSError:
+                pass
+        if self._proc is not None:
+            self._proc.wait()
+        self._forget()
+        return True